@@ -17,13 +17,23 @@ Commands:
 """
 
 import asyncio
+import heapq
 import json
 import logging
+import os
 import sys
+import time
 from datetime import datetime
+from operator import itemgetter
 from pathlib import Path
 from typing import Optional
 
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
 try:
     import discord
     from discord.ext import commands
@@ -35,6 +45,7 @@ except ImportError:
 sys.path.insert(0, str(Path(__file__).parent))
 
 from config.settings import settings
+from src.database import ProductDatabase
 
 logger = logging.getLogger(__name__)
 
@@ -54,21 +65,113 @@ class BotState:
 
 state = BotState()
 
+# Parsed last_run_stats.json, keyed by (mtime_ns, size) of the file on disk
+_stats_cache: dict = {"key": None, "value": None}
+
 
 def load_last_run_stats() -> Optional[dict]:
-    """Load the last run stats from JSON file."""
+    """
+    Load the last run stats from JSON file.
+    The parsed dict is cached and only re-read when the file changes,
+    so back-to-back !status/!produtos/!precos cost a single stat().
+    """
     stats_path = Path("last_run_stats.json")
-    if stats_path.exists():
-        try:
-            with open(stats_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except Exception as e:
-            logger.error(f"Failed to load last_run_stats.json: {e}")
-    return None
+    try:
+        st = stats_path.stat()
+    except OSError:
+        return None
+    
+    key = (st.st_mtime_ns, st.st_size)
+    if _stats_cache["key"] == key:
+        return _stats_cache["value"]
+    
+    try:
+        value = _json_loads(stats_path.read_bytes())
+    except Exception as e:
+        logger.error(f"Failed to load last_run_stats.json: {e}")
+        return None
+    
+    _stats_cache["key"] = key
+    _stats_cache["value"] = value
+    return value
+
+
+def find_latest_file(
+    directory: Path, suffix: str
+) -> tuple[Optional[Path], Optional[os.stat_result]]:
+    """
+    Return (path, stat) of the most recently modified file in directory
+    ending with suffix, or (None, None) if there is none.
+    Single os.scandir pass; DirEntry caches its stat result on most platforms,
+    and the returned stat lets callers read st_size without another syscall.
+    """
+    latest_path = None
+    latest_stat = None
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if not entry.name.endswith(suffix) or entry.name.startswith('.'):
+                continue
+            if not entry.is_file():
+                continue
+            st = entry.stat()
+            if latest_stat is None or st.st_mtime > latest_stat.st_mtime:
+                latest_stat = st
+                latest_path = entry.path
+    if latest_path is None:
+        return None, None
+    return Path(latest_path), latest_stat
+
+
+# DB stats only change during a sync, so !status/!whitelist reuse them briefly
+DB_STATS_TTL_SECONDS = 30
+_db_stats_cache: dict = {"expires": 0.0, "value": None}
+
+
+def get_db_stats() -> tuple[dict, int]:
+    """Return (db.get_stats(), whitelist count), cached for DB_STATS_TTL_SECONDS."""
+    now = time.monotonic()
+    if _db_stats_cache["value"] is not None and now < _db_stats_cache["expires"]:
+        return _db_stats_cache["value"]
+    
+    db = ProductDatabase(settings.db_path)
+    try:
+        value = (db.get_stats(), db.get_site_products_count())
+    finally:
+        db.close()
+    
+    _db_stats_cache["value"] = value
+    _db_stats_cache["expires"] = now + DB_STATS_TTL_SECONDS
+    return value
+
+
+def invalidate_db_stats():
+    """Force the next get_db_stats() call to hit the database."""
+    _db_stats_cache["expires"] = 0.0
+
+
+def read_file_tail(path: Path, size: int, max_chars: int) -> str:
+    """
+    Return the last max_chars characters of a UTF-8 text file.
+    Reads backwards in doubling chunks and decodes only the tail, so large
+    logs don't pay for decoding bytes that are never shown.
+    """
+    step = 4096
+    with open(path, 'rb') as f:
+        while True:
+            step = min(step, size)
+            f.seek(-step, 2)
+            text = f.read(step).decode('utf-8', errors='ignore')
+            if len(text) >= max_chars or step >= size:
+                return text[-max_chars:]
+            step *= 2
 
 
 def create_bot() -> commands.Bot:
     """Create and configure the Discord bot."""
+    # Bound once here (not at module top) so importing bot_control stays light,
+    # while a broken sync pipeline still fails at startup rather than on !sync
+    from main import process_file
+    
     intents = discord.Intents.default()
     intents.message_content = True
     intents.guilds = True
@@ -96,50 +199,51 @@ def create_bot() -> commands.Bot:
     # ==========================================================================
     # HELP COMMAND
     # ==========================================================================
+    # Static content: built once per bot instead of on every !ajuda
+    help_embed = discord.Embed(
+        title="🤖 AquaFlora Stock Bot - Menu de Comandos",
+        description="Controle e monitore a sincronização de estoque diretamente pelo Discord!",
+        color=COLOR_PRIMARY
+    )
+    help_embed.set_thumbnail(url=AQUAFLORA_LOGO)
+    
+    help_embed.add_field(
+        name="📊 **Informativos**",
+        value=(
+            "`!status` - Status atual do sistema\n"
+            "`!whitelist` - Estatísticas da whitelist de SKUs\n"
+            "`!log` - Envia o último arquivo de log"
+        ),
+        inline=False
+    )
+    
+    help_embed.add_field(
+        name="📈 **Inteligência de Negócio**",
+        value=(
+            "`!produtos` - Últimos 10 produtos alterados\n"
+            "`!precos` - Top 5 maiores altas e quedas de preço"
+        ),
+        inline=False
+    )
+    
+    help_embed.add_field(
+        name="⚡ **Ações**",
+        value=(
+            "`!forcar_agora` - Força sincronização imediata\n"
+            "`!sync` - Alias para forcar_agora"
+        ),
+        inline=False
+    )
+    
+    help_embed.set_footer(
+        text="AquaFlora Stock Sync • Bot 2.0",
+        icon_url=AQUAFLORA_LOGO
+    )
+    
     @bot.command(name="ajuda", aliases=["help_sync", "comandos", "menu"])
     async def help_cmd(ctx):
         """Show available commands with rich embed."""
-        embed = discord.Embed(
-            title="🤖 AquaFlora Stock Bot - Menu de Comandos",
-            description="Controle e monitore a sincronização de estoque diretamente pelo Discord!",
-            color=COLOR_PRIMARY
-        )
-        embed.set_thumbnail(url=AQUAFLORA_LOGO)
-        
-        embed.add_field(
-            name="📊 **Informativos**",
-            value=(
-                "`!status` - Status atual do sistema\n"
-                "`!whitelist` - Estatísticas da whitelist de SKUs\n"
-                "`!log` - Envia o último arquivo de log"
-            ),
-            inline=False
-        )
-        
-        embed.add_field(
-            name="📈 **Inteligência de Negócio**",
-            value=(
-                "`!produtos` - Últimos 10 produtos alterados\n"
-                "`!precos` - Top 5 maiores altas e quedas de preço"
-            ),
-            inline=False
-        )
-        
-        embed.add_field(
-            name="⚡ **Ações**",
-            value=(
-                "`!forcar_agora` - Força sincronização imediata\n"
-                "`!sync` - Alias para forcar_agora"
-            ),
-            inline=False
-        )
-        
-        embed.set_footer(
-            text="AquaFlora Stock Sync • Bot 2.0",
-            icon_url=AQUAFLORA_LOGO
-        )
-        
-        await ctx.send(embed=embed)
+        await ctx.send(embed=help_embed)
     
     # ==========================================================================
     # STATUS COMMAND
@@ -167,11 +271,7 @@ def create_bot() -> commands.Bot:
         
         # Get database stats
         try:
-            from src.database import ProductDatabase
-            db = ProductDatabase(settings.db_path)
-            stats = db.get_stats()
-            site_count = db.get_site_products_count()
-            db.close()
+            stats, site_count = get_db_stats()
             
             embed.add_field(
                 name="📊 Produtos no DB",
@@ -218,11 +318,7 @@ def create_bot() -> commands.Bot:
         embed.set_thumbnail(url=AQUAFLORA_LOGO)
         
         try:
-            from src.database import ProductDatabase
-            db = ProductDatabase(settings.db_path)
-            stats = db.get_stats()
-            site_count = db.get_site_products_count()
-            db.close()
+            stats, site_count = get_db_stats()
             
             total = stats.get('total_products', 0)
             on_site = site_count
@@ -285,21 +381,18 @@ def create_bot() -> commands.Bot:
         
         changes = last_stats.get('product_changes', [])[:10]
         
-        embed = discord.Embed(
-            title="📋 Últimos 10 Produtos Alterados",
-            description=f"Da sincronização de {last_stats.get('timestamp', 'N/A')[:16]}",
-            color=COLOR_INFO
-        )
-        embed.set_thumbnail(url=AQUAFLORA_LOGO)
-        
+        # One description block instead of ten embed fields
+        lines = [f"Da sincronização de {last_stats.get('timestamp', 'N/A')[:16]}\n"]
         for change in changes:
+            variation = change.get('price_variation', 0)
+            
             # Determine emoji
             change_type = change.get('change_type', 'updated')
             if change_type == 'new':
                 emoji = "🆕"
-            elif change.get('price_variation', 0) > 0:
+            elif variation > 0:
                 emoji = "📈"
-            elif change.get('price_variation', 0) < 0:
+            elif variation < 0:
                 emoji = "📉"
             else:
                 emoji = "➖"
@@ -308,18 +401,20 @@ def create_bot() -> commands.Bot:
             sku = change.get('sku', 'N/A')
             old_price = change.get('old_price')
             new_price = change.get('new_price', 0)
-            variation = change.get('price_variation', 0)
             
             if old_price:
                 value = f"R$ {old_price:.2f} ➔ R$ {new_price:.2f} ({variation:+.1f}%)"
             else:
                 value = f"R$ {new_price:.2f} (NOVO)"
             
-            embed.add_field(
-                name=f"{emoji} `{sku}` | {name}",
-                value=value,
-                inline=False
-            )
+            lines.append(f"{emoji} `{sku}` | **{name}**\n{value}")
+        
+        embed = discord.Embed(
+            title="📋 Últimos 10 Produtos Alterados",
+            description="\n".join(lines)[:4000],
+            color=COLOR_INFO
+        )
+        embed.set_thumbnail(url=AQUAFLORA_LOGO)
         
         total_changes = len(last_stats.get('product_changes', []))
         if total_changes > 10:
@@ -347,17 +442,19 @@ def create_bot() -> commands.Bot:
         
         changes = last_stats.get('product_changes', [])
         
-        # Filter and sort
-        increases = sorted(
-            [c for c in changes if c.get('price_variation', 0) > 0],
-            key=lambda x: x.get('price_variation', 0),
-            reverse=True
-        )[:5]
+        # Partition in one pass, then pick the top 5 of each side with a heap.
+        # Fields are read once into (variation, sku, old_price, new_price).
+        rising = []
+        falling = []
+        for c in changes:
+            variation = c.get('price_variation', 0)
+            if variation > 0:
+                rising.append((variation, c.get('sku'), c.get('old_price', 0), c.get('new_price', 0)))
+            elif variation < 0:
+                falling.append((variation, c.get('sku'), c.get('old_price', 0), c.get('new_price', 0)))
         
-        decreases = sorted(
-            [c for c in changes if c.get('price_variation', 0) < 0],
-            key=lambda x: x.get('price_variation', 0)
-        )[:5]
+        increases = heapq.nlargest(5, rising, key=itemgetter(0))
+        decreases = heapq.nsmallest(5, falling, key=itemgetter(0))
         
         embed = discord.Embed(
             title="📈📉 Variações de Preço",
@@ -369,8 +466,8 @@ def create_bot() -> commands.Bot:
         # Top Increases
         if increases:
             increase_text = "\n".join([
-                f"📈 `{c.get('sku')}` | **+{c.get('price_variation', 0):.1f}%** (R$ {c.get('old_price', 0):.2f} → {c.get('new_price', 0):.2f})"
-                for c in increases
+                f"📈 `{sku}` | **+{variation:.1f}%** (R$ {old_price:.2f} → {new_price:.2f})"
+                for variation, sku, old_price, new_price in increases
             ])
             embed.add_field(
                 name="🔺 Top 5 Maiores Aumentos",
@@ -387,8 +484,8 @@ def create_bot() -> commands.Bot:
         # Top Decreases
         if decreases:
             decrease_text = "\n".join([
-                f"📉 `{c.get('sku')}` | **{c.get('price_variation', 0):.1f}%** (R$ {c.get('old_price', 0):.2f} → {c.get('new_price', 0):.2f})"
-                for c in decreases
+                f"📉 `{sku}` | **{variation:.1f}%** (R$ {old_price:.2f} → {new_price:.2f})"
+                for variation, sku, old_price, new_price in decreases
             ])
             embed.add_field(
                 name="🔻 Top 5 Maiores Quedas",
@@ -405,12 +502,13 @@ def create_bot() -> commands.Bot:
         # Price warnings
         warnings = last_stats.get('price_warnings', [])
         if warnings:
-            warning_text = "\n".join([
+            warning_lines = [
                 f"🛡️ `{w.get('sku')}` | {w.get('variation_percent', 0):+.1f}% BLOQUEADO"
                 for w in warnings[:3]
-            ])
+            ]
             if len(warnings) > 3:
-                warning_text += f"\n... +{len(warnings) - 3} mais"
+                warning_lines.append(f"... +{len(warnings) - 3} mais")
+            warning_text = "\n".join(warning_lines)
             
             embed.add_field(
                 name="⚠️ Preços Bloqueados (Price Guard)",
@@ -435,25 +533,20 @@ def create_bot() -> commands.Bot:
             await ctx.send(f"📭 Diretório de entrada não existe: `{input_dir}`")
             return
             
-        csv_files = list(input_dir.glob("*.csv"))
+        latest_file, _ = find_latest_file(input_dir, ".csv")
         
-        if not csv_files:
+        if latest_file is None:
             await ctx.send(f"📭 Nenhum arquivo CSV encontrado em `{input_dir}`")
             return
         
-        latest_file = max(csv_files, key=lambda f: f.stat().st_mtime)
-        
         await ctx.send(f"🚀 Iniciando sincronização...\n📁 Arquivo: `{latest_file.name}`")
         
         state.sync_status = "Processing"
         state.is_processing = True
         
         try:
-            loop = asyncio.get_event_loop()
-            summary = await loop.run_in_executor(
-                None,
-                _run_sync,
-                latest_file
+            summary = await asyncio.to_thread(
+                process_file, latest_file, dry_run=settings.dry_run, lite_mode=True
             )
             
             state.last_sync = datetime.now()
@@ -486,6 +579,7 @@ def create_bot() -> commands.Bot:
             await ctx.send(f"❌ Erro na sincronização: ```{str(e)[:500]}```")
         finally:
             state.is_processing = False
+            invalidate_db_stats()
     
     # ==========================================================================
     # LOG COMMAND
@@ -499,20 +593,16 @@ def create_bot() -> commands.Bot:
             await ctx.send("📭 Nenhum log encontrado")
             return
         
-        log_files = list(log_dir.glob("*.log"))
-        if not log_files:
+        latest_log, latest_stat = find_latest_file(log_dir, ".log")
+        if latest_log is None:
             await ctx.send("📭 Nenhum arquivo de log encontrado")
             return
         
-        latest_log = max(log_files, key=lambda f: f.stat().st_mtime)
-        
-        if latest_log.stat().st_size > 8 * 1024 * 1024:
-            with open(latest_log, 'rb') as f:
-                f.seek(-100 * 1024, 2)
-                content = f.read().decode('utf-8', errors='ignore')
+        if latest_stat.st_size > 8 * 1024 * 1024:
+            content = read_file_tail(latest_log, latest_stat.st_size, 1900)
             
             await ctx.send(
-                f"📋 Últimas linhas de `{latest_log.name}`:\n```\n{content[-1900:]}```"
+                f"📋 Últimas linhas de `{latest_log.name}`:\n```\n{content}```"
             )
         else:
             await ctx.send(
@@ -535,12 +625,6 @@ def create_bot() -> commands.Bot:
     return bot
 
 
-def _run_sync(filepath: Path):
-    """Run sync in thread pool."""
-    from main import process_file
-    return process_file(filepath, dry_run=settings.dry_run, lite_mode=True)
-
-
 def main():
     """Run the Discord bot."""
     if not settings.discord_bot_configured:
@@ -27,6 +27,10 @@ class Settings(BaseSettings):
     dry_run: bool = Field(default=False)
     include_zero_stock: bool = Field(default=True)
     min_price: float = Field(default=0.01)
+    always_export_csv: bool = Field(default=False)  # Keep LITE CSV even when the API sync succeeded
+    
+    # Watch mode
+    watch_poll_interval: int = Field(default=30)  # Seconds between scans when input_dir is a network mount
     
     # Safety
     price_guard_max_variation: float = Field(default=40.0)
@@ -49,6 +53,7 @@ class Settings(BaseSettings):
     dashboard_username: str = Field(default="admin")
     dashboard_password: str = Field(default="")  # Empty = no auth required
     dashboard_auth_enabled: bool = Field(default=False)
+    dashboard_template_reload: bool = Field(default=False)  # True = pick up template edits without restart
     
     # Backup
     backup_enabled: bool = Field(default=False)
@@ -6,18 +6,38 @@ FastAPI application for controlling stock synchronization.
 import json
 import logging
 import asyncio
+import functools
+import multiprocessing
+import os
+import re
 import subprocess
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 from pathlib import Path
 from typing import Optional
 
 from fastapi import FastAPI, Request, UploadFile, File, Form, BackgroundTasks, Depends, HTTPException, status
 from fastapi.responses import HTMLResponse, JSONResponse
+
+# Faster JSON parsing/serialization for polled endpoints (optional dependency)
+try:
+    import orjson
+    from fastapi.responses import ORJSONResponse as FastJSONResponse
+    _json_loads = orjson.loads
+except ImportError:
+    FastJSONResponse = JSONResponse
+    _json_loads = json.loads
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from fastapi.security import HTTPBasic, HTTPBasicCredentials
 from contextlib import asynccontextmanager
+from jinja2 import FileSystemBytecodeCache
 import secrets
+import shutil
 
 # APScheduler for scheduled sync
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
@@ -34,6 +54,12 @@ from src.image_scraper import search_and_get_thumbnails
 
 logger = logging.getLogger(__name__)
 
+LOG_CONFIG = {
+    "level": logging.INFO,
+    "format": "%(asctime)s | %(levelname)-7s | %(message)s",
+    "datefmt": "%H:%M:%S",
+}
+
 # Global state
 class AppState:
     is_syncing: bool = False
@@ -44,9 +70,15 @@ class AppState:
 
 state = AppState()
 
+# Held for the whole duration of any sync or site mapping. Handlers acquire it
+# before scheduling the background task, so two requests can't both pass the
+# "already running" check.
+sync_lock = asyncio.Lock()
+
 # Global scheduler instance
 scheduler = AsyncIOScheduler()
 SCHEDULER_JOB_ID = "daily_sync"
+SCHEDULE_TIME_RE = re.compile(r"^([01]?\d|2[0-3])(?::([0-5]?\d))?$")  # HH[:MM]
 WHITELIST_JOB_ID = "weekly_whitelist"
 ACTION_LOG_FILE = Path("logs/actions.log")
 
@@ -62,6 +94,25 @@ metrics = {
     "last_sync_duration_seconds": 0.0,
     "whitelist_refreshes": 0,
 }
+_metrics_lock = threading.Lock()
+
+
+def incr_metrics(**deltas) -> None:
+    """Add deltas to metric counters without losing concurrent updates."""
+    with _metrics_lock:
+        for key, delta in deltas.items():
+            metrics[key] += delta
+
+
+def metrics_snapshot() -> dict:
+    """Return a consistent copy of the metrics counters."""
+    with _metrics_lock:
+        return dict(metrics)
+
+
+# Expected credentials, encoded once for compare_digest
+_DASHBOARD_USERNAME_BYTES = settings.dashboard_username.encode("utf8")
+_DASHBOARD_PASSWORD_BYTES = settings.dashboard_password.encode("utf8")
 
 
 def verify_auth(credentials: HTTPBasicCredentials = Depends(security)):
@@ -77,11 +128,11 @@ def verify_auth(credentials: HTTPBasicCredentials = Depends(security)):
     
     correct_username = secrets.compare_digest(
         credentials.username.encode("utf8"),
-        settings.dashboard_username.encode("utf8")
+        _DASHBOARD_USERNAME_BYTES
     )
     correct_password = secrets.compare_digest(
         credentials.password.encode("utf8"),
-        settings.dashboard_password.encode("utf8")
+        _DASHBOARD_PASSWORD_BYTES
     )
     
     if not (correct_username and correct_password):
@@ -94,17 +145,36 @@ def verify_auth(credentials: HTTPBasicCredentials = Depends(security)):
     return credentials.username
 
 
-def get_auth_dependency():
-    """Return auth dependency only if auth is enabled."""
-    if settings.dashboard_auth_enabled and settings.dashboard_password:
-        return [Depends(verify_auth)]
-    return []
+# Route dependencies, decided once at import: auth only when enabled with a password.
+# Not applied app-wide: /api/status backs the compose healthcheck and must stay open.
+AUTH_DEPS = (
+    [Depends(verify_auth)]
+    if settings.dashboard_auth_enabled and settings.dashboard_password
+    else []
+)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Startup and shutdown events."""
     logger.info("🚀 Dashboard starting...")
+    # One connection for all request handlers; syncs open their own in main.py
+    app.state.db = ProductDatabase(settings.db_path)
+    app.state.curator = ImageCurator(app.state.db)
+    # Syncs are CPU-heavy (parse, enrich, hash): run them in their own process
+    # so they don't hold the GIL against request handlers. spawn avoids forking
+    # a process that already runs scheduler/watcher threads.
+    app.state.sync_pool = ProcessPoolExecutor(
+        max_workers=1,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=functools.partial(logging.basicConfig, **LOG_CONFIG),
+    )
+    start_input_watcher()
+    
+    # Compile all templates up front so the first requests don't pay for it
+    for template_name in templates.env.list_templates():
+        templates.env.get_template(template_name)
+    
     scheduler.start()
     logger.info("⏰ Scheduler started")
     
@@ -123,6 +193,10 @@ async def lifespan(app: FastAPI):
     
     yield
     scheduler.shutdown()
+    stop_input_watcher()
+    app.state.sync_pool.shutdown(wait=True)
+    app.state.curator.close()
+    app.state.db.close()
     logger.info("👋 Dashboard shutting down...")
 
 
@@ -149,65 +223,269 @@ app = FastAPI(
     redoc_url="/redoc",
 )
 
+STATIC_MAX_AGE_SECONDS = 3600
+
+
+class CachedStaticFiles(StaticFiles):
+    """
+    StaticFiles that lets browsers reuse assets without revalidating.
+    URLs are not content-hashed, so the max-age is kept short enough for a
+    deploy to show up; after it expires Starlette's ETag still makes the
+    revalidation a 304.
+    """
+    
+    def file_response(self, *args, **kwargs):
+        response = super().file_response(*args, **kwargs)
+        response.headers["Cache-Control"] = f"public, max-age={STATIC_MAX_AGE_SECONDS}"
+        return response
+
+
 # Mount static files and templates
 static_path = Path(__file__).parent / "static"
 templates_path = Path(__file__).parent / "templates"
 assets_path = Path(__file__).parent
 
-app.mount("/static", StaticFiles(directory=static_path), name="static")
-app.mount("/assets", StaticFiles(directory=assets_path), name="assets")
+app.mount("/static", CachedStaticFiles(directory=static_path), name="static")
+app.mount("/assets", CachedStaticFiles(directory=assets_path), name="assets")
 templates = Jinja2Templates(directory=templates_path)
+# HTMX partials are rendered on every poll: skip the per-render mtime check
+# and keep compiled templates on disk across restarts
+templates.env.auto_reload = settings.dashboard_template_reload
+# Jinja writes cache files into the directory but never creates it (fresh
+# container, rebooted host with a cleared /tmp)
+jinja_cache_dir = Path(tempfile.gettempdir()) / "aquaflora_jinja_cache"
+jinja_cache_dir.mkdir(parents=True, exist_ok=True)
+templates.env.bytecode_cache = FileSystemBytecodeCache(str(jinja_cache_dir))
 
 
 # =============================================================================
 # HELPER FUNCTIONS
 # =============================================================================
 
+def get_db(request: Request) -> ProductDatabase:
+    """FastAPI dependency returning the shared ProductDatabase."""
+    return request.app.state.db
+
+
+def get_curator(request: Request) -> ImageCurator:
+    """FastAPI dependency returning the shared ImageCurator."""
+    return request.app.state.curator
+
+
+# HTMX polling and /metrics scrapes hit these helpers several times per second;
+# a short TTL collapses them into one DB/filesystem read.
+HELPER_CACHE_TTL_SECONDS = 3.0
+_helper_cache: dict = {}
+
+
+def _cache_get(key: str):
+    """Return a cached helper value if it has not expired, else None."""
+    entry = _helper_cache.get(key)
+    if entry and time.monotonic() < entry[0]:
+        return entry[1]
+    return None
+
+
+def _cache_set(key: str, value, ttl: float = HELPER_CACHE_TTL_SECONDS):
+    """Store a helper value for ttl seconds."""
+    _helper_cache[key] = (time.monotonic() + ttl, value)
+
+
+def invalidate_helper_cache(*keys: str):
+    """Drop cached helper values (all of them when no key is given)."""
+    if not keys:
+        _helper_cache.clear()
+    for key in keys:
+        _helper_cache.pop(key, None)
+
+
 def get_dashboard_stats() -> dict:
     """Get stats for dashboard display."""
+    cached = _cache_get("dashboard_stats")
+    if cached is not None:
+        return cached
+    
     try:
-        db = ProductDatabase(settings.db_path)
+        db = app.state.db
         stats = db.get_stats()
         whitelist_count = db.get_site_products_count()
-        db.close()
         
-        return {
+        result = {
             "total_products": stats.get("total_products", 0),
             "whitelist_count": whitelist_count,
             "last_synced": stats.get("last_synced", 0),
         }
+        _cache_set("dashboard_stats", result)
+        return result
     except Exception as e:
         logger.error(f"Failed to get dashboard stats: {e}")
         return {"total_products": 0, "whitelist_count": 0, "last_synced": 0}
 
 
+_last_run_cache: dict = {"key": None, "value": None, "names": {}}
+
+
 def get_last_run_stats() -> Optional[dict]:
-    """Load last run stats from JSON."""
+    """Load last run stats from JSON, re-parsing only when the file changes."""
     stats_path = Path("last_run_stats.json")
-    if stats_path.exists():
-        try:
-            with open(stats_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except Exception:
-            pass
-    return None
+    try:
+        st = stats_path.stat()
+    except OSError:
+        return None
+    
+    key = (st.st_mtime_ns, st.st_size)
+    if _last_run_cache["key"] == key:
+        return _last_run_cache["value"]
+    
+    try:
+        value = _json_loads(stats_path.read_bytes())
+    except Exception:
+        return None
+    
+    _last_run_cache["key"] = key
+    _last_run_cache["value"] = value
+    _last_run_cache["names"] = {
+        change["sku"]: change["name"]
+        for change in value.get("product_changes", [])
+        if "sku" in change and "name" in change
+    }
+    return value
+
+
+def get_last_run_product_names() -> dict:
+    """Map SKU -> product name from the last run's product changes."""
+    if get_last_run_stats() is None:
+        return {}
+    return _last_run_cache["names"]
+
+
+def scan_csv_files(directory: Path):
+    """
+    Yield os.DirEntry objects for the CSV files in directory.
+    DirEntry caches its stat result, so callers pay one stat per file at most.
+    """
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if (
+                entry.name.endswith(".csv")
+                and not entry.name.startswith(".")
+                and entry.is_file()
+            ):
+                yield entry
 
 
 def get_input_files() -> list:
     """Get list of CSV files in input directory."""
+    cached = _cache_get("input_files")
+    if cached is not None:
+        return cached
+    
     input_dir = settings.input_dir
     if not input_dir.exists():
         return []
     
     files = []
-    for f in input_dir.glob("*.csv"):
+    for entry in scan_csv_files(input_dir):
+        st = entry.stat()
         files.append({
-            "name": f.name,
-            "size": f.stat().st_size,
-            "modified": datetime.fromtimestamp(f.stat().st_mtime).strftime("%d/%m %H:%M"),
+            "name": entry.name,
+            "size": st.st_size,
+            "modified": time.strftime("%d/%m %H:%M", time.localtime(st.st_mtime)),
         })
     
-    return sorted(files, key=lambda x: x["modified"], reverse=True)
+    files.sort(key=lambda x: x["modified"], reverse=True)
+    # With a watcher running, CSV events drop the listing; the long TTL only
+    # covers an event racing with this rebuild
+    ttl = INPUT_FILES_WATCHED_TTL_SECONDS if _input_observer["observer"] else HELPER_CACHE_TTL_SECONDS
+    _cache_set("input_files", files, ttl)
+    return files
+
+
+INPUT_FILES_WATCHED_TTL_SECONDS = 60.0
+_input_observer: dict = {"observer": None}
+
+
+def start_input_watcher():
+    """
+    Watch the input directory so get_input_files() is only rebuilt on change.
+    Optional: without watchdog the listing falls back to the short TTL.
+    """
+    try:
+        from watchdog.observers import Observer
+        from watchdog.events import FileSystemEventHandler
+    except ImportError:
+        logger.info("watchdog not installed; input file list uses TTL cache")
+        return
+    
+    class InputFilesHandler(FileSystemEventHandler):
+        def on_any_event(self, event):
+            paths = (event.src_path, getattr(event, "dest_path", "") or "")
+            if any(str(p).lower().endswith(".csv") for p in paths):
+                invalidate_helper_cache("input_files")
+    
+    try:
+        settings.input_dir.mkdir(parents=True, exist_ok=True)
+        observer = Observer()
+        observer.schedule(InputFilesHandler(), str(settings.input_dir), recursive=False)
+        observer.daemon = True
+        observer.start()
+    except Exception as e:
+        logger.warning(f"Failed to watch input directory: {e}")
+        return
+    
+    invalidate_helper_cache("input_files")
+    _input_observer["observer"] = observer
+    logger.info(f"👀 Watching input directory: {settings.input_dir}")
+
+
+def stop_input_watcher():
+    """Stop the input directory watcher, if running."""
+    observer = _input_observer["observer"]
+    if observer is None:
+        return
+    _input_observer["observer"] = None
+    observer.stop()
+    observer.join(timeout=5)
+
+
+# Curators often re-open the same SKU; remote image searches are slow and
+# their results are stable for a while.
+IMAGE_SEARCH_CACHE_TTL_SECONDS = 3600
+IMAGE_SEARCH_CACHE_MAX_ENTRIES = 256
+_image_search_cache: "OrderedDict[tuple, tuple[float, list]]" = OrderedDict()
+
+
+async def search_thumbnails_cached(product_name: str, sku: str, search_mode: str) -> list:
+    """Run search_and_get_thumbnails off the event loop, with a small LRU cache."""
+    key = (sku, product_name, search_mode)
+    entry = _image_search_cache.get(key)
+    if entry and time.monotonic() < entry[0]:
+        _image_search_cache.move_to_end(key)
+        return entry[1]
+    
+    candidates = await asyncio.to_thread(
+        search_and_get_thumbnails,
+        product_name=product_name,
+        sku=sku,
+        max_results=6,
+        search_mode=search_mode,
+    )
+    
+    if candidates:
+        _image_search_cache[key] = (time.monotonic() + IMAGE_SEARCH_CACHE_TTL_SECONDS, candidates)
+        _image_search_cache.move_to_end(key)
+        while len(_image_search_cache) > IMAGE_SEARCH_CACHE_MAX_ENTRIES:
+            _image_search_cache.popitem(last=False)
+    return candidates
+
+
+def render_alert(request: Request, level: str, message: str) -> HTMLResponse:
+    """Render the alert partial; the template escapes the (user-supplied) message."""
+    return templates.TemplateResponse("partials/alert.html", {
+        "request": request,
+        "level": level,
+        "message": message,
+    })
 
 
 def get_action_catalog() -> list:
@@ -424,7 +702,15 @@ def run_action_command(action_id: str, command: str):
             log_file.write(f"ERROR: {e}\n")
 
 
-def scheduled_sync_job():
+async def run_in_sync_pool(func, *args, **kwargs):
+    """Run a picklable top-level function in the app's sync process pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        app.state.sync_pool, functools.partial(func, *args, **kwargs)
+    )
+
+
+async def scheduled_sync_job():
     """
     Job function called by APScheduler at scheduled time.
     Finds the latest CSV and runs sync in lite mode.
@@ -436,27 +722,31 @@ def scheduled_sync_job():
         logger.warning("📭 Input directory not found for scheduled sync")
         return
     
-    csv_files = list(input_dir.glob("*.csv"))
-    if not csv_files:
+    # Get the most recent file
+    latest_entry = max(scan_csv_files(input_dir), key=lambda e: e.stat().st_mtime, default=None)
+    if latest_entry is None:
         logger.warning("📭 No CSV files found for scheduled sync")
         return
-    
-    # Get the most recent file
-    latest_file = max(csv_files, key=lambda f: f.stat().st_mtime)
+    latest_file = Path(latest_entry.path)
     logger.info(f"📁 Running scheduled sync with: {latest_file.name}")
     
+    if sync_lock.locked():
+        logger.warning("⏭️ Scheduled sync skipped: another operation is running")
+        return
+    
     # Import here to avoid circular import
     from main import process_file
     
+    await sync_lock.acquire()
     state.is_syncing = True
     state.sync_status = "Sync agendado..."
     
-    import time as time_module
-    start_time = time_module.time()
-    metrics["syncs_total"] += 1
+    start_time = time.time()
+    incr_metrics(syncs_total=1)
     
     try:
-        summary = process_file(
+        summary = await run_in_sync_pool(
+            process_file,
             latest_file,
             dry_run=False,
             lite_mode=True,  # Scheduled sync always uses lite mode
@@ -466,56 +756,72 @@ def scheduled_sync_job():
         state.sync_status = "Agendado ✅" if summary.success else "Erro ❌"
         
         # Update metrics
-        metrics["syncs_success"] += 1
-        metrics["products_updated"] += summary.total_synced
-        metrics["last_sync_duration_seconds"] = round(time_module.time() - start_time, 2)
+        incr_metrics(syncs_success=1, products_updated=summary.total_synced)
+        metrics["last_sync_duration_seconds"] = round(time.time() - start_time, 2)
         
         logger.info(f"✅ Scheduled sync completed: {summary.total_synced} products")
     except Exception as e:
         logger.error(f"❌ Scheduled sync failed: {e}")
         state.sync_status = f"Erro agendado: {str(e)[:30]}"
-        metrics["syncs_failed"] += 1
+        incr_metrics(syncs_failed=1)
     finally:
         state.is_syncing = False
+        sync_lock.release()
+        invalidate_helper_cache("dashboard_stats")
 
 
-def refresh_whitelist_job():
+async def refresh_whitelist_job():
     """
     Job function to refresh whitelist from WooCommerce.
     Called weekly by scheduler.
     """
+    if sync_lock.locked():
+        logger.warning("⏭️ Whitelist refresh skipped: another operation is running")
+        return
+    
     logger.info("🔄 Auto-refreshing whitelist from WooCommerce...")
     
-    try:
-        from main import map_site_products
-        map_site_products()
-        metrics["whitelist_refreshes"] += 1
-        logger.info("✅ Whitelist refresh completed")
-    except Exception as e:
-        logger.error(f"❌ Whitelist refresh failed: {e}")
+    # Same DB and WooCommerce store as a sync: never run alongside one
+    async with sync_lock:
+        try:
+            from main import map_site_products
+            await asyncio.to_thread(map_site_products)
+            incr_metrics(whitelist_refreshes=1)
+            invalidate_helper_cache("dashboard_stats")
+            logger.info("✅ Whitelist refresh completed")
+        except Exception as e:
+            logger.error(f"❌ Whitelist refresh failed: {e}")
 
 
 async def run_sync_task(filepath: Path, lite_mode: bool = True, allow_create: bool = False):
-    """Run sync in background."""
+    """Run sync in background, holding sync_lock for the whole run."""
     from main import process_file
     
-    state.is_syncing = True
-    state.sync_status = "Processando..."
+    # Checked again here: another operation may have started since the request
+    if sync_lock.locked():
+        logger.warning(f"⏭️ Sync of {filepath.name} skipped: another operation is running")
+        return
     
-    try:
-        summary = process_file(
-            filepath,
-            dry_run=False,
-            lite_mode=lite_mode,
-            allow_create=allow_create,
-        )
-        state.last_sync = datetime.now()
-        state.sync_status = "Concluído ✅" if summary.success else "Erro ❌"
-    except Exception as e:
-        logger.error(f"Sync failed: {e}")
-        state.sync_status = f"Erro: {str(e)[:50]}"
-    finally:
-        state.is_syncing = False
+    async with sync_lock:
+        state.is_syncing = True
+        state.sync_status = "Processando..."
+        
+        try:
+            summary = await run_in_sync_pool(
+                process_file,
+                filepath,
+                dry_run=False,
+                lite_mode=lite_mode,
+                allow_create=allow_create,
+            )
+            state.last_sync = datetime.now()
+            state.sync_status = "Concluído ✅" if summary.success else "Erro ❌"
+        except Exception as e:
+            logger.error(f"Sync failed: {e}")
+            state.sync_status = f"Erro: {str(e)[:50]}"
+        finally:
+            state.is_syncing = False
+            invalidate_helper_cache("dashboard_stats")
 
 
 # =============================================================================
@@ -540,14 +846,10 @@ async def dashboard_page(request: Request):
 
 
 @app.get("/images", response_class=HTMLResponse)
-async def images_page(request: Request):
+async def images_page(request: Request, curator: ImageCurator = Depends(get_curator)):
     """Image curation page."""
     try:
-        db = ProductDatabase(settings.db_path)
-        curator = ImageCurator(db)
         stats = curator.get_stats()
-        curator.close()
-        db.close()
     except Exception as e:
         logger.error(f"Failed to get image stats: {e}")
         stats = {"pending_count": 0, "curated_count": 0}
@@ -574,7 +876,7 @@ async def actions_page(request: Request):
 # API ROUTES
 # =============================================================================
 
-@app.get("/api/status")
+@app.get("/api/status", response_class=FastJSONResponse)
 async def api_status():
     """Get current sync status."""
     stats = get_dashboard_stats()
@@ -591,7 +893,7 @@ async def api_status():
     }
 
 
-@app.get("/metrics")
+@app.get("/metrics", response_class=FastJSONResponse)
 async def get_metrics():
     """
     Get application metrics for monitoring.
@@ -600,7 +902,7 @@ async def get_metrics():
     stats = get_dashboard_stats()
     
     return {
-        **metrics,
+        **metrics_snapshot(),
         "whitelist_count": stats.get("whitelist_count", 0),
         "total_products_in_db": stats.get("total_products", 0),
         "is_syncing": state.is_syncing,
@@ -616,7 +918,7 @@ async def api_run_sync(
     allow_create: bool = Form(False),
 ):
     """Trigger a sync operation."""
-    if state.is_syncing:
+    if sync_lock.locked():
         return JSONResponse(
             {"success": False, "message": "Sync já em andamento!"},
             status_code=409,
@@ -629,7 +931,7 @@ async def api_run_sync(
             status_code=404,
         )
     
-    # Run in background
+    # Run in background (run_sync_task takes sync_lock itself)
     background_tasks.add_task(run_sync_task, filepath, lite_mode, allow_create)
     
     return {"success": True, "message": f"Sync iniciado: {filename}"}
@@ -666,9 +968,13 @@ async def api_upload_csv(file: UploadFile = File(...)):
     settings.input_dir.mkdir(parents=True, exist_ok=True)
     
     try:
-        content = await file.read()
-        with open(filepath, 'wb') as f:
-            f.write(content)
+        # Stream the spooled upload to disk instead of loading it into memory
+        def _save_upload():
+            with open(filepath, 'wb') as f:
+                shutil.copyfileobj(file.file, f, 1024 * 1024)
+        
+        await asyncio.to_thread(_save_upload)
+        invalidate_helper_cache("input_files")
         
         return {"success": True, "message": f"Upload concluído: {file.filename}"}
     except Exception as e:
@@ -691,7 +997,7 @@ async def api_products():
 @app.post("/api/map-site")
 async def api_map_site(background_tasks: BackgroundTasks):
     """Run --map-site to refresh whitelist."""
-    if state.is_syncing:
+    if sync_lock.locked():
         return JSONResponse(
             {"success": False, "message": "Operação em andamento!"},
             status_code=409,
@@ -699,15 +1005,20 @@ async def api_map_site(background_tasks: BackgroundTasks):
     
     async def run_map():
         from main import map_site_products
-        state.is_syncing = True
-        state.sync_status = "Mapeando site..."
-        try:
-            map_site_products()
-            state.sync_status = "Mapeamento concluído ✅"
-        except Exception as e:
-            state.sync_status = f"Erro: {str(e)[:50]}"
-        finally:
-            state.is_syncing = False
+        if sync_lock.locked():
+            logger.warning("⏭️ Site mapping skipped: another operation is running")
+            return
+        async with sync_lock:
+            state.is_syncing = True
+            state.sync_status = "Mapeando site..."
+            try:
+                await asyncio.to_thread(map_site_products)
+                state.sync_status = "Mapeamento concluído ✅"
+            except Exception as e:
+                state.sync_status = f"Erro: {str(e)[:50]}"
+            finally:
+                state.is_syncing = False
+                invalidate_helper_cache("dashboard_stats")
     
     background_tasks.add_task(run_map)
     return {"success": True, "message": "Mapeamento iniciado..."}
@@ -719,12 +1030,16 @@ async def api_schedule(
     time: str = Form("11:00"),
 ):
     """Configure scheduled sync with APScheduler."""
+    match = SCHEDULE_TIME_RE.match(time.strip())
+    if not match:
+        return JSONResponse(
+            {"success": False, "message": f"Horário inválido: {time}"},
+            status_code=400,
+        )
+    hour = int(match.group(1))
+    minute = int(match.group(2) or 0)
+    
     try:
-        # Parse time
-        parts = time.split(":")
-        hour = int(parts[0]) if len(parts) >= 1 else 11
-        minute = int(parts[1]) if len(parts) >= 2 else 0
-        
         if enabled:
             # Remove existing job if any
             try:
@@ -756,11 +1071,6 @@ async def api_schedule(
         
         return {"success": True, "message": message}
         
-    except ValueError as e:
-        return JSONResponse(
-            {"success": False, "message": f"Horário inválido: {time}"},
-            status_code=400,
-        )
     except Exception as e:
         logger.error(f"Failed to configure scheduler: {e}")
         return JSONResponse(
@@ -808,20 +1118,13 @@ async def partial_products(request: Request):
 # =============================================================================
 
 @app.get("/partials/pending-list", response_class=HTMLResponse)
-async def partial_pending_list(request: Request):
+async def partial_pending_list(request: Request, db: ProductDatabase = Depends(get_db)):
     """HTMX partial for pending products list."""
     try:
-        db = ProductDatabase(settings.db_path)
         pending = db.get_pending_images(limit=50)
-        db.close()
         
         # Add product names from last run stats if available
-        last_run = get_last_run_stats()
-        product_names = {}
-        if last_run:
-            for change in last_run.get("product_changes", []):
-                if "sku" in change and "name" in change:
-                    product_names[change["sku"]] = change["name"]
+        product_names = get_last_run_product_names()
         
         for p in pending:
             p["name"] = product_names.get(p["sku"], p["sku"])
@@ -837,36 +1140,29 @@ async def partial_pending_list(request: Request):
 
 
 @app.get("/api/images/search/{sku}", response_class=HTMLResponse)
-async def api_search_images(request: Request, sku: str, mode: str = "auto"):
+async def api_search_images(
+    request: Request,
+    sku: str,
+    mode: str = "auto",
+    db: ProductDatabase = Depends(get_db),
+):
     """Search images for a product and return HTMX partial."""
     try:
         # Get product name from database or use SKU
-        db = ProductDatabase(settings.db_path)
         record = db.get_record(sku)
-        db.close()
         
         # Use SKU as product name if no record found
         product_name = sku
         if record:
             # Try to get name from last run
-            last_run = get_last_run_stats()
-            if last_run:
-                for change in last_run.get("product_changes", []):
-                    if change.get("sku") == sku:
-                        product_name = change.get("name", sku)
-                        break
+            product_name = get_last_run_product_names().get(sku, sku)
         
         # Search for images
         search_mode = (mode or "auto").lower()
         if search_mode not in ("auto", "premium", "cheap"):
             search_mode = "auto"
 
-        candidates = search_and_get_thumbnails(
-            product_name=product_name,
-            sku=sku,
-            max_results=6,
-            search_mode=search_mode
-        )
+        candidates = await search_thumbnails_cached(product_name, sku, search_mode)
         
     except Exception as e:
         logger.error(f"Image search failed for SKU {sku}: {e}")
@@ -880,72 +1176,53 @@ async def api_search_images(request: Request, sku: str, mode: str = "auto"):
 
 @app.post("/api/images/select")
 async def api_select_image(
+    request: Request,
     sku: str = Form(...),
     image_url: str = Form(...),
+    curator: ImageCurator = Depends(get_curator),
 ):
     """Save selected image for a product."""
     try:
-        db = ProductDatabase(settings.db_path)
-        curator = ImageCurator(db)
-        
         success = curator.save_selection(
             sku=sku,
             image_url=image_url,
             download=True
         )
         
-        curator.close()
-        db.close()
-        
         if success:
-            return HTMLResponse(
-                '<div class="alert alert-success">✅ Imagem salva para ' + sku + '</div>'
-            )
+            return render_alert(request, "success", f"✅ Imagem salva para {sku}")
         else:
-            return HTMLResponse(
-                '<div class="alert alert-error">❌ Erro ao salvar imagem</div>'
-            )
+            return render_alert(request, "error", "❌ Erro ao salvar imagem")
             
     except Exception as e:
         logger.error(f"Failed to save image for SKU {sku}: {e}")
-        return HTMLResponse(
-            '<div class="alert alert-error">❌ Erro: ' + str(e)[:50] + '</div>'
-        )
+        return render_alert(request, "error", f"❌ Erro: {str(e)[:50]}")
 
 
 @app.post("/api/images/apply-family")
-async def api_apply_family(sku: str = Form(...)):
+async def api_apply_family(
+    request: Request,
+    sku: str = Form(...),
+    curator: ImageCurator = Depends(get_curator),
+):
     """Apply image to product family (same prefix)."""
     try:
-        db = ProductDatabase(settings.db_path)
-        curator = ImageCurator(db)
-        
         count = curator.apply_to_family(sku)
         
-        curator.close()
-        db.close()
-        
-        return HTMLResponse(
-            f'<div class="alert alert-success">👨‍👩‍👧‍👦 Imagem aplicada para {count} produtos da família</div>'
+        return render_alert(
+            request, "success", f"👨‍👩‍👧‍👦 Imagem aplicada para {count} produtos da família"
         )
         
     except Exception as e:
         logger.error(f"Failed to apply family for SKU {sku}: {e}")
-        return HTMLResponse(
-            '<div class="alert alert-error">❌ Erro: ' + str(e)[:50] + '</div>'
-        )
+        return render_alert(request, "error", f"❌ Erro: {str(e)[:50]}")
 
 
 @app.get("/api/images/stats")
-async def api_image_stats():
+async def api_image_stats(curator: ImageCurator = Depends(get_curator)):
     """Get image curation statistics."""
     try:
-        db = ProductDatabase(settings.db_path)
-        curator = ImageCurator(db)
-        stats = curator.get_stats()
-        curator.close()
-        db.close()
-        return stats
+        return curator.get_stats()
     except Exception as e:
         logger.error(f"Failed to get image stats: {e}")
         return {"pending_count": 0, "curated_count": 0, "uploaded_count": 0}
@@ -1028,7 +1305,7 @@ async def api_scraper_progress():
     """Get image scraper progress and statistics."""
     try:
         progress_file = Path("data/scraper_progress.json")
-        cache_file = Path("data/vision_cache.json")
+        cache_file = Path("data/vision_cache.sqlite")
         image_dir = Path("data/images")
         
         result = {
@@ -1045,7 +1322,7 @@ async def api_scraper_progress():
         
         # Count actual images
         if image_dir.exists():
-            result["images_downloaded"] = len(list(image_dir.glob("*.jpg")))
+            result["images_downloaded"] = sum(1 for _ in image_dir.glob("*.jpg"))
         
         # Load progress
         if progress_file.exists():
@@ -1063,9 +1340,12 @@ async def api_scraper_progress():
         
         # Load cache size
         if cache_file.exists():
-            with open(cache_file, 'r', encoding='utf-8') as f:
-                cache = json.load(f)
-            result["cache_entries"] = len(cache)
+            import sqlite3
+            conn = sqlite3.connect(f"file:{cache_file.as_posix()}?mode=ro", uri=True)
+            try:
+                result["cache_entries"] = conn.execute("SELECT COUNT(*) FROM vision_cache").fetchone()[0]
+            finally:
+                conn.close()
         
         return result
         
@@ -1081,11 +1361,7 @@ async def api_scraper_progress():
 if __name__ == "__main__":
     import uvicorn
     
-    logging.basicConfig(
-        level=logging.INFO,
-        format="%(asctime)s | %(levelname)-7s | %(message)s",
-        datefmt="%H:%M:%S"
-    )
+    logging.basicConfig(**LOG_CONFIG)
     
     print("🖥️  AquaFlora Stock Sync - Dashboard")
     print("   Acesse: http://localhost:8080")
@@ -13,10 +13,14 @@ Usage:
 """
 
 import argparse
+import atexit
+import functools
 import logging
+import multiprocessing
 import sys
 import io
 import os
+import re
 
 # Fix Windows console encoding for emojis. Skip under pytest because replacing
 # captured stdout/stderr during module import breaks pytest's capture files.
@@ -24,6 +28,7 @@ if sys.platform == 'win32' and "pytest" not in sys.modules:
     sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
     sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8', errors='replace')
     os.environ['PYTHONIOENCODING'] = 'utf-8'
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime
 from logging.handlers import RotatingFileHandler
 from pathlib import Path
@@ -33,13 +38,27 @@ from typing import Optional
 sys.path.insert(0, str(Path(__file__).parent))
 
 from config.settings import settings
-from src.parser import AthosParser
 from src.enricher import ProductEnricher
 from src.database import ProductDatabase
-from src.sync import WooSyncManager
-from src.notifications import NotificationService
 from src.models import SyncSummary
-from src.image_scraper import category_to_folder
+
+# The parser (ftfy), WooCommerce client, notifier (httpx) and image scraper
+# (DDGS/Pillow) are imported inside the functions that use them, so
+# --map-site, --watch and `from main import ...` don't pay for all of them.
+
+try:
+    import orjson
+
+    def _write_json(path: Path, data) -> None:
+        """Write indented UTF-8 JSON (orjson when installed)."""
+        path.write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+except ImportError:
+    import json as _json
+
+    def _write_json(path: Path, data) -> None:
+        """Write indented UTF-8 JSON (orjson when installed)."""
+        with open(path, 'w', encoding='utf-8') as f:
+            _json.dump(data, f, indent=2, ensure_ascii=False)
 
 
 def setup_logging(log_level: str = "INFO", log_dir: Path = Path("./logs")):
@@ -72,6 +91,7 @@ def setup_logging(log_level: str = "INFO", log_dir: Path = Path("./logs")):
             maxBytes=settings.log_rotation_mb * 1024 * 1024,
             backupCount=5,
             encoding="utf-8",
+            delay=True,  # Don't create the file until something is logged
         )
         file_handler.setLevel(logging.DEBUG)
         file_handler.setFormatter(logging.Formatter(
@@ -121,6 +141,7 @@ def process_file(input_file: Path, dry_run: bool = False, lite_mode: bool = Fals
     logger.info(f"{'='*60}")
     
     # 1. Parse input file
+    from src.parser import AthosParser
     logger.info("📖 Parsing input file...")
     parser = AthosParser()
     raw_products = parser.parse_file(input_file)
@@ -136,7 +157,7 @@ def process_file(input_file: Path, dry_run: bool = False, lite_mode: bool = Fals
     
     for reason, count in exclusion_stats.items():
         if count > 0:
-            logger.info(f"🚫 Excluídos {count} produtos: {reason}")
+            logger.info("🚫 Excluídos %s produtos: %s", count, reason)
     
     # 1.6. Test mode: filter only priority categories (PET, PESCA, AQUARISMO)
     if teste_mode:
@@ -158,15 +179,13 @@ def process_file(input_file: Path, dry_run: bool = False, lite_mode: bool = Fals
     
     # 2. Enrich products
     logger.info("🔧 Enriching products...")
-    enricher = ProductEnricher()
-    enriched_products = []
-    
-    for raw in raw_products:
-        try:
-            enriched = enricher.enrich(raw)
-            enriched_products.append(enriched)
-        except Exception as e:
-            logger.warning(f"Failed to enrich {raw.sku}: {e}")
+    enriched_products, failures = enrich_products(raw_products)
+    # Only the count is needed from here on; drop the raw list so it isn't
+    # held alongside enriched_products through sync and export
+    total_parsed = len(raw_products)
+    del raw_products
+    for sku, error in failures:
+        logger.warning("Failed to enrich %s: %s", sku, error)
     
     logger.info(f"✅ Enriched {len(enriched_products)} products")
     
@@ -174,7 +193,7 @@ def process_file(input_file: Path, dry_run: bool = False, lite_mode: bool = Fals
     if enriched_products:
         sample = enriched_products[0]
         sample_weight = sample.weight_total_kg or sample.weight_kg or 'No weight'
-        logger.info(f"   Sample: {sample.sku} | {sample.name} | {sample.brand or 'No brand'} | {sample_weight}kg")
+        logger.info("   Sample: %s | %s | %s | %skg", sample.sku, sample.name, sample.brand or 'No brand', sample_weight)
 
     # 2.5. Outlier report (weights)
     outlier_report = generate_weight_outlier_report(enriched_products, exclusion_config)
@@ -188,7 +207,7 @@ def process_file(input_file: Path, dry_run: bool = False, lite_mode: bool = Fals
     logger.info(f"   Database: {stats['total_products']} products, {stats['synced_to_woo']} synced")
     
     # 4. Sync to WooCommerce (if enabled)
-    summary = SyncSummary(total_parsed=len(raw_products), total_enriched=len(enriched_products))
+    summary = SyncSummary(total_parsed=total_parsed, total_enriched=len(enriched_products))
     
     if settings.sync_enabled and settings.woo_configured:
         logger.info("🔄 Syncing to WooCommerce...")
@@ -200,6 +219,7 @@ def process_file(input_file: Path, dry_run: bool = False, lite_mode: bool = Fals
         elif not allow_create:
             logger.warning("⚠️  No products mapped! Run --map-site first or use --allow-create")
         
+        from src.sync import WooSyncManager
         syncer = WooSyncManager(
             woo_url=settings.woo_url,
             consumer_key=settings.woo_consumer_key,
@@ -210,11 +230,14 @@ def process_file(input_file: Path, dry_run: bool = False, lite_mode: bool = Fals
             allow_create=allow_create,
         )
         
-        summary = syncer.sync_products(
-            enriched_products,
-            db,
-            zero_ghost_stock=settings.zero_ghost_stock,
-        )
+        try:
+            summary = syncer.sync_products(
+                enriched_products,
+                db,
+                zero_ghost_stock=settings.zero_ghost_stock,
+            )
+        finally:
+            syncer.close()
     else:
         if not settings.woo_configured:
             logger.warning("⚠️ WooCommerce credentials not configured - skipping sync")
@@ -224,39 +247,93 @@ def process_file(input_file: Path, dry_run: bool = False, lite_mode: bool = Fals
         # Just update summary with enriched count
         summary.success = True
     
-    # 5. Export to CSV (always)
-    logger.info("📤 Exporting to CSV...")
+    # Every row already reached WooCommerce for real (not dry-run, not skipped)
+    synced_ok = (
+        settings.sync_enabled and settings.woo_configured
+        and not effective_dry_run and summary.success
+    )
+    
+    # 5. Export
+    _export_outputs(
+        enriched_products, input_file,
+        lite_mode, lite_images_mode, effective_dry_run,
+        synced_ok,
+    )
+    
+    # 6. Notifications go out in the background (webhook round trips only)
+    _NOTIFY_EXECUTOR.submit(_notify_in_background, summary)
+    
+    # 7-8. Stats and backup stay inline: the bot and dashboard read
+    # last_run_stats.json as soon as process_file returns
+    _save_stats_and_backup(summary)
+    
+    # 9. Print final report
+    print_report(summary)
+    
+    db.close()
+    return summary
+
+
+def _export_outputs(
+    enriched_products: list,
+    input_file: Path,
+    lite_mode: bool,
+    lite_images_mode: bool,
+    dry_run: bool,
+    synced_ok: bool = False,
+):
+    """Step 5 of process_file: write the CSV export (and dry-run review files)."""
+    logger = logging.getLogger(__name__)
     if lite_images_mode:
+        logger.info("📤 Exporting to CSV...")
         output_file = export_to_csv_lite_images(enriched_products, settings.output_dir)
+        logger.info(f"✅ Exported to: {output_file}")
     elif lite_mode:
-        output_file = export_to_csv_lite(enriched_products, settings.output_dir)
+        # The LITE CSV is only a manual-import fallback for a failed sync
+        if synced_ok and not settings.always_export_csv:
+            logger.info("ℹ️ Sync OK - LITE CSV skipped (set ALWAYS_EXPORT_CSV=true to keep it)")
+        else:
+            logger.info("📤 Exporting to CSV...")
+            output_file = export_to_csv_lite(enriched_products, settings.output_dir)
+            logger.info(f"✅ Exported to: {output_file}")
     else:
+        logger.info("📤 Exporting to CSV...")
         output_file = export_to_csv_full(enriched_products, settings.output_dir)
-    logger.info(f"✅ Exported to: {output_file}")
+        logger.info(f"✅ Exported to: {output_file}")
 
-    if effective_dry_run:
+    if dry_run:
         review_dir = export_dry_run_review_files(
             enriched_products,
             settings.output_dir,
             input_file=input_file,
         )
         logger.info(f"🧹 Dry-run review files: {review_dir}")
-    
-    # 6. Send notifications
-    if settings.discord_webhook_configured:
-        logger.info("📨 Sending notifications...")
-        notifier = NotificationService(
-            discord_webhook_url=settings.discord_webhook_url,
-            telegram_webhook_url=settings.telegram_webhook_url,
-        )
-        notifier.send_report(summary)
-        notifier.close()
+
+
+def _send_notifications(summary: SyncSummary):
+    """Step 6 of process_file: post the sync report to the webhooks."""
+    if not settings.discord_webhook_configured:
+        return
+    logger = logging.getLogger(__name__)
+    from src.notifications import NotificationService
+    logger.info("📨 Sending notifications...")
+    notifier = NotificationService(
+        discord_webhook_url=settings.discord_webhook_url,
+        telegram_webhook_url=settings.telegram_webhook_url,
+    )
+    notifier.send_report(summary)
+    notifier.close()
+
+
+def _save_stats_and_backup(summary: SyncSummary):
+    """Steps 7-8 of process_file: save last_run_stats.json, then back up."""
+    logger = logging.getLogger(__name__)
     
     # 7. Save last run stats for bot commands
     summary.to_json_file("last_run_stats.json")
     logger.debug("📊 Saved last_run_stats.json for bot commands")
     
-    # 8. Run backup if enabled
+    # 8. Run backup if enabled (uploads the stats file, so it goes after 7)
     if settings.backup_configured and summary.success:
         from src.backup import run_backup
         logger.info("☁️ Running backup to cloud storage...")
@@ -273,28 +350,83 @@ def process_file(input_file: Path, dry_run: bool = False, lite_mode: bool = Fals
                 logger.warning("⚠️ Backup failed - check rclone configuration")
         except Exception as e:
             logger.error(f"❌ Backup error: {e}")
-    
-    # 9. Print final report
-    print_report(summary)
-    
-    db.close()
-    return summary
 
 
-def _load_excluded_departments() -> set:
-    """Load departments to exclude from config/exclusion_list.json."""
-    import json
-    exclusion_file = Path("config/exclusion_list.json")
-    
-    if not exclusion_file.exists():
-        return {}
-    
+def _notify_in_background(summary: SyncSummary):
+    """Step 6 of process_file, run on _NOTIFY_EXECUTOR."""
     try:
-        with open(exclusion_file, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        _send_notifications(summary)
     except Exception as e:
-        logging.getLogger(__name__).warning(f"Could not load exclusion list: {e}")
-        return {}
+        logging.getLogger(__name__).error(f"❌ Notification error: {e}")
+
+
+# One worker keeps reports in run order; drained at exit so the final run's
+# notification is still sent by one-shot CLI runs
+_NOTIFY_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix="notify")
+atexit.register(_NOTIFY_EXECUTOR.shutdown, wait=True)
+
+
+# Enrichment is pure CPU (regex, string formatting). Large files are split
+# across worker processes; small ones stay in-process to skip pickling costs.
+ENRICH_PARALLEL_MIN_PRODUCTS = 2000
+ENRICH_CHUNK_SIZE = 500
+_worker_enricher: Optional[ProductEnricher] = None
+
+
+def _enrich_chunk(raw_chunk: list) -> tuple[list, list]:
+    """Enrich a chunk of RawProducts. Returns (enriched, [(sku, error), ...])."""
+    global _worker_enricher
+    if _worker_enricher is None:
+        _worker_enricher = ProductEnricher()
+    
+    enriched, failed = [], []
+    for raw in raw_chunk:
+        try:
+            enriched.append(_worker_enricher.enrich(raw))
+        except Exception as e:
+            failed.append((raw.sku, str(e)))
+    return enriched, failed
+
+
+def enrich_products(raw_products: list) -> tuple[list, list]:
+    """
+    Enrich raw products, preserving input order.
+    Returns (enriched_products, [(sku, error), ...] for failures).
+    """
+    chunks = [
+        raw_products[i:i + ENRICH_CHUNK_SIZE]
+        for i in range(0, len(raw_products), ENRICH_CHUNK_SIZE)
+    ]
+    workers = min(os.cpu_count() or 1, len(chunks))
+    
+    enriched_products, failures = [], []
+    if len(raw_products) >= ENRICH_PARALLEL_MIN_PRODUCTS and workers > 1:
+        # spawn, not fork: callers (bot thread, --watch worker, notification
+        # executor) have threads running, and forking those is unsafe
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        ) as executor:
+            results = list(executor.map(_enrich_chunk, chunks))
+    else:
+        results = map(_enrich_chunk, chunks)
+    
+    for enriched, failed in results:
+        enriched_products.extend(enriched)
+        failures.extend(failed)
+    return enriched_products, failures
+
+
+# Weight in a lowercased product name (e.g., "10kg", "25 kg", "5 Kg")
+_NAME_WEIGHT_RE = re.compile(r'(\d+(?:[.,]\d+)?)\s*kg')
+
+
+@functools.lru_cache(maxsize=8)
+def _keyword_regex(keywords: tuple[str, ...]):
+    """Compile keywords into one literal-substring alternation (None if empty)."""
+    if not keywords:
+        return None
+    return re.compile("|".join(re.escape(kw) for kw in keywords))
 
 
 def _filter_excluded_products(products, config: dict):
@@ -302,8 +434,6 @@ def _filter_excluded_products(products, config: dict):
     Filter products based on exclusion config.
     Returns (filtered_products, stats_dict)
     """
-    import re
-    
     if not config:
         return products, {}
     
@@ -318,8 +448,10 @@ def _filter_excluded_products(products, config: dict):
     for category_keywords in exclude_keywords.values():
         all_keywords.extend([kw.lower() for kw in category_keywords])
     
-    # Weight pattern to extract from name (e.g., "10kg", "25 kg", "5 Kg")
-    weight_pattern = re.compile(r'(\d+(?:[.,]\d+)?)\s*kg', re.IGNORECASE)
+    # One alternation per keyword list: a single C-level scan per name
+    # instead of a Python substring test per keyword
+    keyword_regex = _keyword_regex(tuple(all_keywords))
+    heavy_regex = _keyword_regex(tuple(allow_heavy_keywords))
     
     stats = {
         'departamentos': 0,
@@ -328,33 +460,45 @@ def _filter_excluded_products(products, config: dict):
         'sku_manual': 0
     }
     
+    # Departments repeat across thousands of rows: upper() each one once
+    dept_excluded: dict[str, bool] = {}
+    
     filtered = []
     for p in products:
-        # 1. Check department
-        if p.department.upper() in excluded_depts:
-            stats['departamentos'] += 1
-            continue
-        
-        # 2. Check SKU exclusion
+        # 1. Check SKU exclusion (plain set lookup, cheapest check first)
         if p.sku in excluded_skus:
             stats['sku_manual'] += 1
             continue
         
+        # 2. Check department
+        department = p.department
+        is_excluded = dept_excluded.get(department)
+        if is_excluded is None:
+            is_excluded = department.upper() in excluded_depts
+            dept_excluded[department] = is_excluded
+        if is_excluded:
+            stats['departamentos'] += 1
+            continue
+        
         # 3. Check keywords in name
         name_lower = p.name.lower()
-        if any(kw in name_lower for kw in all_keywords):
+        if keyword_regex and keyword_regex.search(name_lower):
             stats['keywords'] += 1
             continue
         
         # 4. Check weight from name (e.g., "Ração 25kg")
         # Mas PERMITE ração até 15kg
-        weight_match = weight_pattern.search(p.name)
+        weight_match = _NAME_WEIGHT_RE.search(name_lower)
         if weight_match:
             weight_str = weight_match.group(1).replace(',', '.')
             try:
                 weight = float(weight_str)
-                # Se for ração, permite até 15kg
-                is_racao = any(kw in name_lower for kw in allow_heavy_keywords)
+                # Se for ração, permite até 15kg (only worth checking when
+                # the weight is over at least one of the two limits)
+                if weight <= min(15.0, max_weight):
+                    filtered.append(p)
+                    continue
+                is_racao = bool(heavy_regex and heavy_regex.search(name_lower))
                 limit = 15.0 if is_racao else max_weight
                 
                 if weight > limit:
@@ -368,20 +512,35 @@ def _filter_excluded_products(products, config: dict):
     return filtered, stats
 
 
+# Parsed exclusion list, reused until the file changes on disk (watch mode
+# re-enters process_file for every dropped file). Treat the dict as read-only.
+_exclusion_config_cache: dict = {"key": None, "value": {}}
+
+
 def _load_exclusion_config() -> dict:
     """Load full exclusion config from config/exclusion_list.json."""
     import json
     exclusion_file = Path("config/exclusion_list.json")
     
-    if not exclusion_file.exists():
+    try:
+        stat = exclusion_file.stat()
+    except OSError:
         return {}
     
+    key = (stat.st_mtime_ns, stat.st_size)
+    if _exclusion_config_cache["key"] == key:
+        return _exclusion_config_cache["value"]
+    
     try:
         with open(exclusion_file, 'r', encoding='utf-8') as f:
-            return json.load(f)
+            config = json.load(f)
     except Exception as e:
         logging.getLogger(__name__).warning(f"Could not load exclusion list: {e}")
         return {}
+    
+    _exclusion_config_cache["key"] = key
+    _exclusion_config_cache["value"] = config
+    return config
 
 
 def _get_outlier_max_kg(category: str, category_original: str, rules: dict) -> tuple[float, str]:
@@ -410,13 +569,20 @@ def generate_weight_outlier_report(products, config: dict) -> Optional[Path]:
 
     outliers = []
     by_category = {}
+    # Few distinct categories: resolve each threshold once, not per product
+    thresholds = {}
 
     for p in products:
         weight_total = p.weight_total_kg or p.weight_kg
         if not weight_total:
             continue
 
-        max_kg, rule_key = _get_outlier_max_kg(p.category, p.category_original, rules)
+        category_key = (p.category, p.category_original)
+        threshold = thresholds.get(category_key)
+        if threshold is None:
+            threshold = _get_outlier_max_kg(p.category, p.category_original, rules)
+            thresholds[category_key] = threshold
+        max_kg, rule_key = threshold
         if weight_total > max_kg:
             outliers.append({
                 "sku": p.sku,
@@ -452,9 +618,7 @@ def generate_weight_outlier_report(products, config: dict) -> Optional[Path]:
         "items": outliers,
     }
 
-    with open(json_path, 'w', encoding='utf-8') as f:
-        import json
-        json.dump(report, f, indent=2, ensure_ascii=False)
+    _write_json(json_path, report)
 
     # Markdown summary
     lines = ["# ⚖️ Relatório de Outliers de Peso", "", f"Gerado em: {report['generated_at']}", ""]
@@ -740,26 +904,8 @@ def _review_csv_row(product, group_key: str) -> dict:
     }
 
 
-def _local_image_path_for_product(product) -> Optional[Path]:
-    image_dir = Path("data/images")
-    if not product.sku or not image_dir.exists():
-        return None
-
-    extensions = [".jpg", ".png", ".webp", ".avif", ".jpeg", ".gif"]
-    category_path = image_dir / category_to_folder(product.category)
-
-    if category_path.exists():
-        for ext in extensions:
-            candidate = category_path / f"{product.sku}{ext}"
-            if candidate.exists():
-                return candidate
-
-    for ext in extensions:
-        matches = list(image_dir.rglob(f"{product.sku}{ext}"))
-        if matches:
-            return matches[0]
-
-    return None
+def _local_image_path_for_product(product, image_index: dict[str, list[Path]]) -> Optional[Path]:
+    return _find_indexed_image(image_index, Path("data/images"), product.sku, product.category)
 
 
 def _write_images_review_markdown(review_dir: Path, groups: dict[str, list]) -> Path:
@@ -773,6 +919,7 @@ def _write_images_review_markdown(review_dir: Path, groups: dict[str, list]) ->
         "",
     ]
 
+    image_index = _build_image_index(Path("data/images"))
     group_image_stats = {}
     for group in REVIEW_GROUPS:
         key = group["key"]
@@ -781,7 +928,7 @@ def _write_images_review_markdown(review_dir: Path, groups: dict[str, list]) ->
         missing = []
 
         for product in items:
-            if _local_image_path_for_product(product):
+            if _local_image_path_for_product(product, image_index):
                 with_image += 1
             elif len(missing) < 20:
                 missing.append(product)
@@ -816,7 +963,6 @@ def _write_images_review_markdown(review_dir: Path, groups: dict[str, list]) ->
 def export_dry_run_review_files(products, output_dir: Path, input_file: Optional[Path] = None) -> Path:
     """Export dry-run review files split by coarse cleanup groups."""
     import csv
-    import json
     from collections import Counter
 
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -916,12 +1062,151 @@ def export_dry_run_review_files(products, output_dir: Path, input_file: Optional
         ],
     }
 
-    with open(review_dir / "refine_summary.json", "w", encoding="utf-8") as f:
-        json.dump(summary, f, indent=2, ensure_ascii=False)
+    _write_json(review_dir / "refine_summary.json", summary)
 
     return review_dir
 
 
+# CSV export layouts and image lookup order, built once at import time
+# instead of on every export (watch mode re-enters these per file).
+
+# Minimal columns for WooCommerce import (update by SKU): SKU, price, stock.
+LITE_CSV_COLUMNS = ('SKU', 'Regular price', 'Stock')
+
+# Columns for WooCommerce import with images
+LITE_IMAGES_CSV_COLUMNS = ('SKU', 'Regular price', 'Stock', 'In stock?', 'Images')
+
+# FORMATO PT-BR - igual ao export do WooCommerce
+FULL_CSV_COLUMNS = (
+    'ID', 'Tipo', 'SKU', 'GTIN, UPC, EAN, ou ISBN', 'Nome', 'Publicado',
+    'Em destaque?', 'Visibilidade no catálogo', 'Descrição curta', 'Descrição',
+    'Data de preço promocional começa em', 'Data de preço promocional termina em',
+    'Status do imposto', 'Classe de imposto', 'Em estoque?', 'Estoque',
+    'Quantidade baixa de estoque', 'São permitidas encomendas?', 'Vendido individualmente?',
+    'Peso (kg)', 'Comprimento (cm)', 'Largura (cm)', 'Altura (cm)',
+    'Permitir avaliações de clientes?', 'Observação de compra', 'Preço promocional', 'Preço',
+    'Categorias', 'Tags', 'Classe de entrega', 'Imagens',
+    'Limite de downloads', 'Dias para expirar o download', 'Ascendente', 'Grupo de produtos',
+    'Upsells', 'Venda cruzada', 'URL externa', 'Texto do botão', 'Posição',
+    'Swatches Attributes', 'Marcas',
+    'Nome do atributo 1', 'Valores do atributo 1', 'Visibilidade do atributo 1', 'Atributo global 1',
+)
+
+# Descrição HTML do export completo, preenchida com str.format por produto
+# (templates built once instead of three large f-strings per row)
+DESCRIPTION_TEMPLATE_BRAND_WEIGHT = '''<div class="product-description">
+<h2>{name}</h2>
+<p>Produto <strong>{brand}</strong> da linha {category}. Disponível na <strong>AquaFlora Agroshop</strong> com <strong>{peso_display}</strong> e melhor custo-benefício.</p>
+<ul class="product-features">
+  <li>🏷️ <strong>Marca:</strong> {brand}</li>
+    <li>⚖️ <strong>Peso/Conteúdo:</strong> {peso_display}{peso_extra}</li>
+  <li>📦 <strong>Categoria:</strong> {category}</li>
+  <li>✅ <strong>Produto Original</strong> com garantia</li>
+  <li>🚚 <strong>Entrega Rápida</strong> para todo o Brasil</li>
+  <li>💳 <strong>Diversas formas de pagamento</strong></li>
+</ul>
+<div class="cta-section">
+<p>📞 <strong>Dúvidas?</strong> Nossa equipe está pronta para ajudar!</p>
+<p>⭐ <strong>AquaFlora Agroshop</strong> - Sua loja de confiança!</p>
+</div>
+</div>'''
+
+DESCRIPTION_TEMPLATE_BRAND = '''<div class="product-description">
+<h2>{name}</h2>
+<p>Produto <strong>{brand}</strong> da linha {category}. Disponível na <strong>AquaFlora Agroshop</strong> com melhor custo-benefício.</p>
+<ul class="product-features">
+  <li>🏷️ <strong>Marca:</strong> {brand}</li>
+  <li>📦 <strong>Categoria:</strong> {category}</li>
+  <li>✅ <strong>Produto Original</strong> com garantia</li>
+  <li>🚚 <strong>Entrega Rápida</strong> para todo o Brasil</li>
+  <li>💳 <strong>Diversas formas de pagamento</strong></li>
+</ul>
+<div class="cta-section">
+<p>📞 <strong>Dúvidas?</strong> Nossa equipe está pronta para ajudar!</p>
+<p>⭐ <strong>AquaFlora Agroshop</strong> - Sua loja de confiança!</p>
+</div>
+</div>'''
+
+DESCRIPTION_TEMPLATE_PLAIN = '''<div class="product-description">
+<h2>{name}</h2>
+<p>Produto de alta qualidade da categoria {category}. Disponível na <strong>AquaFlora Agroshop</strong> com melhor custo-benefício.</p>
+<ul class="product-features">
+  <li>📦 <strong>Categoria:</strong> {category}</li>
+  <li>✅ <strong>Produto Original</strong> com garantia</li>
+  <li>🚚 <strong>Entrega Rápida</strong> para todo o Brasil</li>
+  <li>💳 <strong>Diversas formas de pagamento</strong></li>
+</ul>
+<div class="cta-section">
+<p>📞 <strong>Dúvidas?</strong> Nossa equipe está pronta para ajudar!</p>
+<p>⭐ <strong>AquaFlora Agroshop</strong> - Sua loja de confiança!</p>
+</div>
+</div>'''
+
+# 1 MB write buffer: large exports flush in a few big writes instead of
+# one per 8 KB default block
+CSV_WRITE_BUFFER_BYTES = 1 << 20
+
+# Extensões em ordem de prioridade
+IMAGE_EXTENSIONS = ('.jpg', '.png', '.webp', '.avif', '.jpeg', '.gif')
+_IMAGE_EXT_RANK = {ext: rank for rank, ext in enumerate(IMAGE_EXTENSIONS)}
+
+
+def _build_image_index(image_dir: Path) -> dict[str, list[Path]]:
+    """
+    Walk the image tree once and map SKU (file stem) -> image paths.
+    
+    Paths for each SKU are sorted by IMAGE_EXTENSIONS priority. Exports look
+    products up here instead of running rglob over the whole tree per product.
+    """
+    index: dict[str, list[Path]] = {}
+    if not image_dir.is_dir():
+        return index
+    
+    pending = [str(image_dir)]
+    while pending:
+        with os.scandir(pending.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    pending.append(entry.path)
+                    continue
+                stem, ext = os.path.splitext(entry.name)
+                if ext.lower() in _IMAGE_EXT_RANK:
+                    index.setdefault(stem, []).append(Path(entry.path))
+    
+    for paths in index.values():
+        paths.sort(key=lambda path: _IMAGE_EXT_RANK[path.suffix.lower()])
+    return index
+
+
+def _find_indexed_image(
+    index: dict[str, list[Path]],
+    image_dir: Path,
+    sku: str,
+    category: str,
+) -> Optional[Path]:
+    """
+    Busca imagem do produto por SKU no índice.
+    
+    Procura em:
+    1. data/images/{categoria}/{sku}.{ext}
+    2. data/images/**/{sku}.{ext} (qualquer pasta)
+    
+    Prioridade: jpg > png > webp > avif > jpeg > gif
+    """
+    if not sku:
+        return None
+    paths = index.get(sku)
+    if not paths:
+        return None
+    
+    from src.image_scraper import category_to_folder
+    cat_path = image_dir / category_to_folder(category)
+    for path in paths:
+        if path.parent == cat_path:
+            return path
+    return paths[0]
+
+
 def export_to_csv_lite(products, output_dir: Path) -> Path:
     """
     Export products to CSV for LITE mode (WooCommerce import).
@@ -936,20 +1221,10 @@ def export_to_csv_lite(products, output_dir: Path) -> Path:
     if not products:
         return output_file
     
-    # Minimal columns for WooCommerce import (update by SKU): SKU, price, stock.
-    columns = ['SKU', 'Regular price', 'Stock']
-    
-    with open(output_file, 'w', newline='', encoding='utf-8') as f:
+    with open(output_file, 'w', newline='', encoding='utf-8', buffering=CSV_WRITE_BUFFER_BYTES) as f:
         writer = csv.writer(f)
-        writer.writerow(columns)
-        
-        for p in products:
-            row = [
-                p.sku,
-                str(p.price),
-                p.stock,
-            ]
-            writer.writerow(row)
+        writer.writerow(LITE_CSV_COLUMNS)
+        writer.writerows((p.sku, str(p.price), p.stock) for p in products)
     
     return output_file
 
@@ -978,57 +1253,35 @@ def export_to_csv_lite_images(products, output_dir: Path) -> Path:
     images_missing = 0
     logger = logging.getLogger(__name__)
     
-    def _find_image_path(sku: str, category: str) -> Optional[Path]:
-        """Busca imagem do produto por SKU."""
-        if not sku:
-            return None
-        
-        extensions = ['.jpg', '.png', '.webp', '.avif', '.jpeg', '.gif']
-        cat_folder = category_to_folder(category)
-        cat_path = image_dir / cat_folder
-        
-        # 1. Busca direta na pasta da categoria
-        if cat_path.exists():
-            for ext in extensions:
-                direct = cat_path / f"{sku}{ext}"
-                if direct.exists():
-                    return direct
-        
-        # 2. Busca recursiva em todas as pastas
-        for ext in extensions:
-            matches = list(image_dir.rglob(f"{sku}{ext}"))
-            if matches:
-                return matches[0]
-        
-        return None
-    
-    # Columns for WooCommerce import with images
-    columns = ['SKU', 'Regular price', 'Stock', 'In stock?', 'Images']
+    # One walk of data/images instead of an rglob per product
+    image_index = _build_image_index(image_dir)
     
-    with open(output_file, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.writer(f)
-        writer.writerow(columns)
-        
+    def _rows():
+        nonlocal images_found, images_missing
         for p in products:
             # Check if image exists
-            image_path = _find_image_path(p.sku, p.category)
+            image_path = _find_indexed_image(image_index, image_dir, p.sku, p.category)
             image_url = ""
             
-            if image_base_url and image_path and image_path.exists():
+            if image_base_url and image_path:
                 rel_path = image_path.relative_to(image_dir).as_posix()
                 image_url = f"{image_base_url}/{rel_path}"
                 images_found += 1
             else:
                 images_missing += 1
             
-            row = [
+            yield (
                 p.sku,
                 str(p.price),
                 p.stock,
                 1 if p.stock > 0 else 0,
                 image_url,
-            ]
-            writer.writerow(row)
+            )
+    
+    with open(output_file, 'w', newline='', encoding='utf-8', buffering=CSV_WRITE_BUFFER_BYTES) as f:
+        writer = csv.writer(f)
+        writer.writerow(LITE_IMAGES_CSV_COLUMNS)
+        writer.writerows(_rows())
     
     logger.info(f"📷 Images: {images_found} found, {images_missing} missing ({images_found/(images_found+images_missing)*100:.1f}% coverage)")
     
@@ -1057,69 +1310,21 @@ def export_to_csv_full(products, output_dir: Path, output_file: Optional[Path] =
     
     images_found = 0
     
-    # FORMATO PT-BR - igual ao export do WooCommerce
-    columns = [
-        'ID', 'Tipo', 'SKU', 'GTIN, UPC, EAN, ou ISBN', 'Nome', 'Publicado',
-        'Em destaque?', 'Visibilidade no catálogo', 'Descrição curta', 'Descrição',
-        'Data de preço promocional começa em', 'Data de preço promocional termina em',
-        'Status do imposto', 'Classe de imposto', 'Em estoque?', 'Estoque',
-        'Quantidade baixa de estoque', 'São permitidas encomendas?', 'Vendido individualmente?',
-        'Peso (kg)', 'Comprimento (cm)', 'Largura (cm)', 'Altura (cm)',
-        'Permitir avaliações de clientes?', 'Observação de compra', 'Preço promocional', 'Preço',
-        'Categorias', 'Tags', 'Classe de entrega', 'Imagens',
-        'Limite de downloads', 'Dias para expirar o download', 'Ascendente', 'Grupo de produtos',
-        'Upsells', 'Venda cruzada', 'URL externa', 'Texto do botão', 'Posição',
-        'Swatches Attributes', 'Marcas',
-        'Nome do atributo 1', 'Valores do atributo 1', 'Visibilidade do atributo 1', 'Atributo global 1',
-    ]
     
     logger = logging.getLogger(__name__)
     
-    def _find_image_path(sku: str, category: str) -> Optional[Path]:
-        """
-        Busca imagem do produto por SKU.
-        
-        Procura em:
-        1. data/images/{categoria}/{sku}.{ext}
-        2. data/images/**/{sku}.{ext} (busca recursiva)
-        
-        Extensões suportadas: jpg, jpeg, png, webp, avif, gif
-        Prioridade: jpg > png > webp > avif > jpeg > gif
-        """
-        if not sku:
-            return None
-        
-        # Extensões em ordem de prioridade
-        extensions = ['.jpg', '.png', '.webp', '.avif', '.jpeg', '.gif']
-        
-        cat_folder = category_to_folder(category)
-        cat_path = image_dir / cat_folder
-        
-        # 1. Busca direta na pasta da categoria
-        if cat_path.exists():
-            for ext in extensions:
-                direct = cat_path / f"{sku}{ext}"
-                if direct.exists():
-                    return direct
-        
-        # 2. Busca recursiva em todas as pastas
-        for ext in extensions:
-            matches = list(image_dir.rglob(f"{sku}{ext}"))
-            if matches:
-                return matches[0]
-        
-        return None
-
-    with open(output_file, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.writer(f)
-        writer.writerow(columns)
-        
+    # One walk of data/images instead of an rglob per product
+    image_index = _build_image_index(image_dir)
+    
+    def _rows():
+        """Build one CSV row per product (consumed by writer.writerows)."""
+        nonlocal images_found
         for p in products:
             # Check if image exists
-            image_path = _find_image_path(p.sku, p.category)
+            image_path = _find_indexed_image(image_index, image_dir, p.sku, p.category)
             image_url = ""
             
-            if image_base_url and image_path and image_path.exists():
+            if image_base_url and image_path:
                 rel_path = image_path.relative_to(image_dir).as_posix()
                 image_url = f"{image_base_url}/{rel_path}"
                 images_found += 1
@@ -1140,53 +1345,19 @@ def export_to_csv_full(products, output_dir: Path, output_file: Optional[Path] =
             
             # Descrição completa HTML com marca e peso
             if p.brand and peso_total:
-                description = f'''<div class="product-description">
-<h2>{p.name}</h2>
-<p>Produto <strong>{p.brand}</strong> da linha {p.category}. Disponível na <strong>AquaFlora Agroshop</strong> com <strong>{peso_display}</strong> e melhor custo-benefício.</p>
-<ul class="product-features">
-  <li>🏷️ <strong>Marca:</strong> {p.brand}</li>
-    <li>⚖️ <strong>Peso/Conteúdo:</strong> {peso_display}{' (' + str(peso_qty) + 'x ' + peso_unit_display + ')' if peso_qty and peso_unit else ''}</li>
-  <li>📦 <strong>Categoria:</strong> {p.category}</li>
-  <li>✅ <strong>Produto Original</strong> com garantia</li>
-  <li>🚚 <strong>Entrega Rápida</strong> para todo o Brasil</li>
-  <li>💳 <strong>Diversas formas de pagamento</strong></li>
-</ul>
-<div class="cta-section">
-<p>📞 <strong>Dúvidas?</strong> Nossa equipe está pronta para ajudar!</p>
-<p>⭐ <strong>AquaFlora Agroshop</strong> - Sua loja de confiança!</p>
-</div>
-</div>'''
+                description_template = DESCRIPTION_TEMPLATE_BRAND_WEIGHT
             elif p.brand:
-                description = f'''<div class="product-description">
-<h2>{p.name}</h2>
-<p>Produto <strong>{p.brand}</strong> da linha {p.category}. Disponível na <strong>AquaFlora Agroshop</strong> com melhor custo-benefício.</p>
-<ul class="product-features">
-  <li>🏷️ <strong>Marca:</strong> {p.brand}</li>
-  <li>📦 <strong>Categoria:</strong> {p.category}</li>
-  <li>✅ <strong>Produto Original</strong> com garantia</li>
-  <li>🚚 <strong>Entrega Rápida</strong> para todo o Brasil</li>
-  <li>💳 <strong>Diversas formas de pagamento</strong></li>
-</ul>
-<div class="cta-section">
-<p>📞 <strong>Dúvidas?</strong> Nossa equipe está pronta para ajudar!</p>
-<p>⭐ <strong>AquaFlora Agroshop</strong> - Sua loja de confiança!</p>
-</div>
-</div>'''
+                description_template = DESCRIPTION_TEMPLATE_BRAND
             else:
-                description = f'''<div class="product-description">
-<h2>{p.name}</h2>
-<p>Produto de alta qualidade da categoria {p.category}. Disponível na <strong>AquaFlora Agroshop</strong> com melhor custo-benefício.</p>
-<ul class="product-features">
-  <li>📦 <strong>Categoria:</strong> {p.category}</li>
-  <li>✅ <strong>Produto Original</strong> com garantia</li>
-  <li>🚚 <strong>Entrega Rápida</strong> para todo o Brasil</li>
-  <li>💳 <strong>Diversas formas de pagamento</strong></li>
-</ul>
-<div class="cta-section">
-<p>📞 <strong>Dúvidas?</strong> Nossa equipe está pronta para ajudar!</p>
-<p>⭐ <strong>AquaFlora Agroshop</strong> - Sua loja de confiança!</p>
-</div>
-</div>'''
+                description_template = DESCRIPTION_TEMPLATE_PLAIN
+            peso_extra = f" ({peso_qty}x {peso_unit_display})" if peso_qty and peso_unit else ""
+            description = description_template.format(
+                name=p.name,
+                brand=p.brand,
+                category=p.category,
+                peso_display=peso_display,
+                peso_extra=peso_extra,
+            )
             
             # Tags: categoria + marca
             tags = [p.category]
@@ -1248,7 +1419,12 @@ def export_to_csv_full(products, output_dir: Path, output_file: Optional[Path] =
                 1 if p.brand else '',  # Visibilidade do atributo 1
                 1 if p.brand else '',  # Atributo global 1
             ]
-            writer.writerow(row)
+            yield row
+
+    with open(output_file, 'w', newline='', encoding='utf-8', buffering=CSV_WRITE_BUFFER_BYTES) as f:
+        writer = csv.writer(f)
+        writer.writerow(FULL_CSV_COLUMNS)
+        writer.writerows(_rows())
     
     logger.info(f"🖼️  Imagens encontradas: {images_found} de {len(products)} produtos")
     
@@ -1257,42 +1433,103 @@ def export_to_csv_full(products, output_dir: Path, output_file: Optional[Path] =
 
 def print_report(summary: SyncSummary):
     """Print final sync report to console."""
-    print("\n" + "="*60)
-    print("📊 RELATÓRIO FINAL")
-    print("="*60)
+    # Built up front and written in one call, so log lines from the
+    # background post-processing can't land in the middle of it
+    lines = [
+        "",
+        "="*60,
+        "📊 RELATÓRIO FINAL",
+        "="*60,
+    ]
     
     status = "✅ SUCESSO" if summary.success else "❌ ERROS ENCONTRADOS"
-    print(f"Status: {status}")
-    print(f"Horário: {summary.timestamp.strftime('%Y-%m-%d %H:%M:%S')}")
-    print()
+    lines.append(f"Status: {status}")
+    lines.append(f"Horário: {summary.timestamp.strftime('%Y-%m-%d %H:%M:%S')}")
+    lines.append("")
     
-    print(f"📄 Produtos parseados: {summary.total_parsed}")
-    print(f"🔧 Produtos enriquecidos: {summary.total_enriched}")
-    print()
+    lines.append(f"📄 Produtos parseados: {summary.total_parsed}")
+    lines.append(f"🔧 Produtos enriquecidos: {summary.total_enriched}")
+    lines.append("")
     
-    print(f"✨ Novos criados: {summary.new_products}")
-    print(f"🔄 Atualizações completas: {summary.full_updates}")
-    print(f"⚡ Atualizações rápidas: {summary.fast_updates}")
-    print(f"⏭️  Ignorados (sem mudanças): {summary.skipped}")
-    print()
+    lines.append(f"✨ Novos criados: {summary.new_products}")
+    lines.append(f"🔄 Atualizações completas: {summary.full_updates}")
+    lines.append(f"⚡ Atualizações rápidas: {summary.fast_updates}")
+    lines.append(f"⏭️  Ignorados (sem mudanças): {summary.skipped}")
+    lines.append("")
     
     if summary.price_warnings:
-        print(f"🚫 Bloqueados pelo PriceGuard: {len(summary.price_warnings)}")
+        lines.append(f"🚫 Bloqueados pelo PriceGuard: {len(summary.price_warnings)}")
         for w in summary.price_warnings[:5]:
-            print(f"   • {w.sku}: R${w.old_price:.2f} → R${w.new_price:.2f} ({w.variation_percent:.1f}%)")
-        print()
+            lines.append(f"   • {w.sku}: R${w.old_price:.2f} → R${w.new_price:.2f} ({w.variation_percent:.1f}%)")
+        lines.append("")
     
     if summary.ghost_skus_zeroed:
-        print(f"👻 SKUs fantasma zerados: {len(summary.ghost_skus_zeroed)}")
-        print()
+        lines.append(f"👻 SKUs fantasma zerados: {len(summary.ghost_skus_zeroed)}")
+        lines.append("")
     
     if summary.errors:
-        print(f"❌ Erros: {len(summary.errors)}")
+        lines.append(f"❌ Erros: {len(summary.errors)}")
         for e in summary.errors[:5]:
-            print(f"   • {e}")
-        print()
+            lines.append(f"   • {e}")
+        lines.append("")
+    
+    lines.append("="*60)
+    sys.stdout.write("\n".join(lines) + "\n")
+
+
+MAP_SITE_PER_PAGE = 100
+MAP_SITE_CONCURRENCY = 5  # WooCommerce hosts rate-limit aggressive clients
+
+
+def _iter_site_product_pages(wcapi, logger):
+    """
+    Yield (page, products) for every WooCommerce product page, in page order.
+    Page 1 tells us X-WP-TotalPages; the remaining pages are fetched
+    concurrently. Raises RuntimeError on a non-200 response.
+    """
+    def fetch(page: int) -> list:
+        response = wcapi.get("products", params={
+            "page": page,
+            "per_page": MAP_SITE_PER_PAGE,
+            "status": "any",  # Include drafts and published
+        })
+        if response.status_code != 200:
+            raise RuntimeError(f"API Error on page {page}: {response.status_code}")
+        return response.json()
+    
+    first = wcapi.get("products", params={
+        "page": 1,
+        "per_page": MAP_SITE_PER_PAGE,
+        "status": "any",
+    })
+    if first.status_code != 200:
+        raise RuntimeError(f"API Error on page 1: {first.status_code}")
+    products = first.json()
+    if not products:
+        return
+    yield 1, products
+    
+    total_pages = first.headers.get("X-WP-TotalPages")
+    if not total_pages:
+        # Header missing (proxy/cache stripped it): walk pages until empty
+        page = 2
+        while products := fetch(page):
+            yield page, products
+            page += 1
+        return
     
-    print("="*60)
+    total_pages = int(total_pages)
+    logger.info(f"   {total_pages} pages to fetch ({MAP_SITE_CONCURRENCY} at a time)")
+    with ThreadPoolExecutor(max_workers=MAP_SITE_CONCURRENCY) as executor:
+        pages = range(2, total_pages + 1)
+        futures = [executor.submit(fetch, page) for page in pages]
+        try:
+            for page, future in zip(pages, futures):
+                yield page, future.result()
+        finally:
+            # First failure (or caller bailing out): drop pages not yet started
+            for future in futures:
+                future.cancel()
 
 
 def map_site_products():
@@ -1310,9 +1547,9 @@ def map_site_products():
         logger.error("   Configure WOO_URL, WOO_CONSUMER_KEY, WOO_CONSUMER_SECRET in .env")
         return False
     
-    from woocommerce import API as WooAPI
+    from src.sync import PooledWooAPI
     
-    wcapi = WooAPI(
+    wcapi = PooledWooAPI(
         url=settings.woo_url,
         consumer_key=settings.woo_consumer_key,
         consumer_secret=settings.woo_consumer_secret,
@@ -1320,77 +1557,118 @@ def map_site_products():
         timeout=60,
     )
     
-    db = ProductDatabase(settings.db_path)
-    
-    # Clear existing whitelist to rebuild fresh
-    logger.info("🔄 Clearing existing whitelist...")
-    db.clear_whitelist()
-    
-    page = 1
-    per_page = 100
+    db = None
     total_mapped = 0
     total_without_sku = 0
     had_error = False
     
-    logger.info("📥 Fetching products from WooCommerce (this may take a while)...")
-    
-    while True:
-        try:
-            response = wcapi.get("products", params={
-                "page": page,
-                "per_page": per_page,
-                "status": "any",  # Include drafts and published
-            })
-            
-            if response.status_code != 200:
-                logger.error(f"API Error: {response.status_code}")
-                had_error = True
-                break
-            
-            products = response.json()
-            
-            if not products:
-                break  # No more products
-            
+    try:
+        db = ProductDatabase(settings.db_path)
+        
+        # Clear existing whitelist to rebuild fresh
+        logger.info("🔄 Clearing existing whitelist...")
+        db.clear_whitelist()
+        
+        logger.info("📥 Fetching products from WooCommerce (this may take a while)...")
+        
+        for page, products in _iter_site_product_pages(wcapi, logger):
+            page_pairs = []
             for p in products:
                 sku = p.get("sku", "").strip()
                 woo_id = p.get("id")
                 name = p.get("name", "")[:50]
                 
                 if sku and woo_id:
-                    db.save_from_woocommerce(sku, woo_id)
-                    total_mapped += 1
-                    logger.debug(f"   Mapped: {sku} → WooID {woo_id} ({name})")
+                    page_pairs.append((sku, woo_id))
+                    logger.debug("   Mapped: %s → WooID %s (%s)", sku, woo_id, name)
                 else:
                     total_without_sku += 1
-                    logger.debug(f"   Skipped: WooID {woo_id} (no SKU) - {name}")
+                    logger.debug("   Skipped: WooID %s (no SKU) - %s", woo_id, name)
             
-            logger.info(f"   Page {page}: Found {len(products)} products...")
-            page += 1
+            # One transaction per page instead of one commit per product
+            db.save_from_woocommerce_bulk(page_pairs)
+            total_mapped += len(page_pairs)
             
-        except Exception as e:
-            logger.error(f"Error fetching page {page}: {e}")
-            had_error = True
-            break
+            logger.info(f"   Page {page}: Found {len(products)} products...")
+    except Exception as e:
+        logger.error(f"Error mapping products: {e}")
+        had_error = True
+    finally:
+        wcapi.close()
+        if db is not None:
+            db.close()
     
-    db.close()
     success = total_mapped > 0 and not had_error
 
-    print("\n" + "="*60)
-    print("📊 MAPEAMENTO CONCLUÍDO")
-    print("="*60)
-    print(f"✅ Produtos mapeados (com SKU): {total_mapped}")
-    print(f"⚠️  Produtos sem SKU (ignorados): {total_without_sku}")
-    print(f"\n🛡️  Whitelist salva em: {settings.db_path}")
-    print("   Agora você pode rodar sync com segurança!")
-    print("="*60)
+    sys.stdout.write("\n".join([
+        "",
+        "="*60,
+        "📊 MAPEAMENTO CONCLUÍDO",
+        "="*60,
+        f"✅ Produtos mapeados (com SKU): {total_mapped}",
+        f"⚠️  Produtos sem SKU (ignorados): {total_without_sku}",
+        "",
+        f"🛡️  Whitelist salva em: {settings.db_path}",
+        "   Agora você pode rodar sync com segurança!",
+        "="*60,
+    ]) + "\n")
     return success
 
 
+# Filesystems that don't deliver inotify events for changes made elsewhere
+# (other hosts, or the host side of a Docker Desktop bind mount)
+NETWORK_FS_TYPES = {
+    "nfs", "nfs4", "cifs", "smb3", "smbfs", "9p",
+    "fuse.sshfs", "fuse.grpcfuse", "fakeowner",
+}
+
+
+def _is_network_mount(path: Path) -> bool:
+    """True if path lives on a network filesystem (Linux /proc/mounts only)."""
+    try:
+        with open("/proc/mounts", encoding="utf-8") as f:
+            mounts = [line.split()[1:3] for line in f if line.strip()]
+    except OSError:
+        return False  # Not Linux: the native observer handles local dirs
+    
+    resolved = str(path.resolve())
+    best_point, best_type = "", ""
+    for mount_point, fs_type in mounts:
+        mount_point = mount_point.replace("\\040", " ")
+        inside = (
+            resolved == mount_point
+            or resolved.startswith(mount_point.rstrip("/") + "/")
+        )
+        if inside and len(mount_point) > len(best_point):
+            best_point, best_type = mount_point, fs_type
+    return best_type in NETWORK_FS_TYPES
+
+
+def _wait_until_written(filepath: Path, settle: float = 0.5, max_wait: float = 60.0) -> bool:
+    """
+    Wait until filepath stops growing (on_created fires as soon as the copy
+    starts). Returns False if the file disappeared.
+    """
+    import time
+    deadline = time.monotonic() + max_wait
+    try:
+        last_size = filepath.stat().st_size
+        while time.monotonic() < deadline:
+            time.sleep(settle)
+            size = filepath.stat().st_size
+            if size == last_size:
+                return True
+            last_size = size
+    except OSError:
+        return False
+    return True
+
+
 def watch_mode():
     """Run in daemon mode, watching input folder for new files."""
     try:
         from watchdog.observers import Observer
+        from watchdog.observers.polling import PollingObserver
         from watchdog.events import FileSystemEventHandler
     except ImportError:
         print("❌ watchdog not installed. Run: pip install watchdog")
@@ -1398,6 +1676,20 @@ def watch_mode():
     
     logger = logging.getLogger(__name__)
     
+    # Files are synced on a single worker so watchdog's dispatch thread never
+    # blocks on a sync; one worker keeps runs serial (shared DB and stats file)
+    sync_worker = ThreadPoolExecutor(max_workers=1, thread_name_prefix="watch-sync")
+    queued_files = set()
+    
+    def _process_queued(filepath: Path):
+        if not _wait_until_written(filepath):
+            logger.warning(f"⚠️ {filepath.name} disappeared before it could be processed")
+            return
+        try:
+            process_file(filepath, dry_run=settings.dry_run)
+        except Exception as e:
+            logger.error(f"Error processing {filepath}: {e}")
+    
     class NewFileHandler(FileSystemEventHandler):
         def on_created(self, event):
             if event.is_directory:
@@ -1405,31 +1697,45 @@ def watch_mode():
             
             filepath = Path(event.src_path)
             if filepath.suffix.lower() in ('.csv', '.txt'):
-                logger.info(f"📁 New file detected: {filepath.name}")
                 try:
-                    process_file(filepath, dry_run=settings.dry_run)
-                except Exception as e:
-                    logger.error(f"Error processing {filepath}: {e}")
+                    key = (filepath, filepath.stat().st_mtime_ns)
+                except OSError:
+                    return  # Removed before we got to it
+                if key in queued_files:
+                    return
+                queued_files.add(key)
+                logger.info(f"📁 New file detected: {filepath.name}")
+                sync_worker.submit(_process_queued, filepath)
     
     input_dir = settings.input_dir
     input_dir.mkdir(parents=True, exist_ok=True)
     
     handler = NewFileHandler()
-    observer = Observer()
+    # Native observer (inotify/FSEvents/ReadDirectoryChangesW) where the
+    # kernel pushes events; network mounts never get them, so poll those
+    # at a slow interval instead of rescanning every second
+    if _is_network_mount(input_dir):
+        logger.info(f"🌐 Network mount detected - polling every {settings.watch_poll_interval}s")
+        observer = PollingObserver(timeout=settings.watch_poll_interval)
+    else:
+        observer = Observer()
     observer.schedule(handler, str(input_dir), recursive=False)
     observer.start()
     
     logger.info(f"👁️ Watching for new files in: {input_dir}")
     logger.info("Press Ctrl+C to stop...")
     
+    # Block in join() instead of waking every second. Windows can't interrupt
+    # a blocking join with Ctrl+C, so keep a short timeout there.
+    join_timeout = 1.0 if sys.platform == 'win32' else 3600.0
     try:
-        while True:
-            import time
-            time.sleep(1)
+        while observer.is_alive():
+            observer.join(timeout=join_timeout)
     except KeyboardInterrupt:
         observer.stop()
     
     observer.join()
+    sync_worker.shutdown(wait=True)
 
 
 def main():
@@ -26,7 +26,9 @@ import logging
 import os
 import shutil
 import signal
+import sqlite3
 import sys
+import threading
 import time
 from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError, wait, FIRST_COMPLETED
 from datetime import datetime
@@ -88,6 +90,7 @@ MAX_CONCURRENT = 3  # Parallel requests (conservative for API limits)
 MAX_RETRIES = 3
 RETRY_BASE_DELAY = 2  # seconds
 PRODUCT_TIMEOUT = 60  # Max seconds per product before skipping
+MAX_IMAGE_BYTES = 8 * 1024 * 1024  # Abort downloads bigger than this (8MB)
 MAX_WORKERS_CHEAP = int(os.getenv("SCRAPER_CHEAP_WORKERS", "4"))
 MAX_WORKERS_PREMIUM = int(os.getenv("SCRAPER_PREMIUM_WORKERS", "1"))
 
@@ -113,66 +116,171 @@ logger = logging.getLogger(__name__)
 # =============================================================================
 
 class VisionCache:
-    """Cache Vision AI results by URL hash to avoid duplicate analysis."""
+    """
+    Cache Vision AI results by URL hash to avoid duplicate analysis.
+    
+    Backed by SQLite so each set() is a single-row upsert (committed right
+    away) instead of rewriting the whole JSON file; a legacy
+    vision_cache.json is imported the first time the database is created.
+    """
     
     def __init__(self, cache_file: Path):
         self.cache_file = cache_file
-        self.cache: dict = {}
+        self.db_file = cache_file.with_suffix(".sqlite")
         self.hits = 0
         self.misses = 0
-        self._load()
-    
-    def _load(self):
-        if self.cache_file.exists():
-            try:
-                with open(self.cache_file, 'r', encoding='utf-8') as f:
-                    self.cache = json.load(f)
-                logger.info(f"📦 Vision cache loaded: {len(self.cache)} entries")
-            except Exception:
-                self.cache = {}
+        self._lock = threading.Lock()
+        self.db_file.parent.mkdir(parents=True, exist_ok=True)
+        # Shared by the worker threads; every access goes through _lock
+        self.conn = sqlite3.connect(str(self.db_file), check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS vision_cache (
+                hash TEXT PRIMARY KEY,
+                score REAL,
+                labels TEXT,
+                is_product_image INTEGER,
+                safe_search_ok INTEGER
+            )
+            """
+        )
+        self._import_json()
+        count = self.conn.execute("SELECT COUNT(*) FROM vision_cache").fetchone()[0]
+        logger.info(f"📦 Vision cache loaded: {count} entries")
     
-    def save(self):
-        self.cache_file.parent.mkdir(parents=True, exist_ok=True)
-        with open(self.cache_file, 'w', encoding='utf-8') as f:
-            json.dump(self.cache, f, indent=2, ensure_ascii=False)
+    def _import_json(self):
+        """One-time import of the old whole-file JSON cache."""
+        if not self.cache_file.exists():
+            return
+        if self.conn.execute("SELECT 1 FROM vision_cache LIMIT 1").fetchone():
+            return
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                legacy = json.load(f)
+        except Exception:
+            return
+        # Autocommit connection: one explicit transaction for the whole import
+        self.conn.execute("BEGIN")
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO vision_cache VALUES (?, ?, ?, ?, ?)",
+            [
+                (
+                    key, entry.get("score", 0.0),
+                    json.dumps(entry.get("labels", []), ensure_ascii=False),
+                    int(bool(entry.get("is_product_image"))),
+                    int(bool(entry.get("safe_search_ok"))),
+                )
+                for key, entry in legacy.items()
+            ]
+        )
+        self.conn.execute("COMMIT")
     
     def _url_hash(self, url: str) -> str:
         return hashlib.md5(url.encode()).hexdigest()[:16]
     
     def get(self, url: str) -> Optional[dict]:
         key = self._url_hash(url)
-        if key in self.cache:
+        with self._lock:
+            if self.conn is None:
+                return None
+            row = self.conn.execute(
+                "SELECT score, labels, is_product_image, safe_search_ok FROM vision_cache WHERE hash = ?",
+                (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
             self.hits += 1
-            return self.cache[key]
-        self.misses += 1
-        return None
+        return {
+            "score": row[0],
+            "labels": json.loads(row[1]),
+            "is_product_image": bool(row[2]),
+            "safe_search_ok": bool(row[3]),
+        }
     
     def set(self, url: str, result: VisionAnalysisResult):
         key = self._url_hash(url)
-        self.cache[key] = {
-            "score": result.score,
-            "labels": result.labels,
-            "is_product_image": result.is_product_image,
-            "safe_search_ok": result.safe_search_ok,
-        }
+        with self._lock:
+            if self.conn is None:
+                return
+            self.conn.execute(
+                "INSERT OR REPLACE INTO vision_cache VALUES (?, ?, ?, ?, ?)",
+                (
+                    key, result.score,
+                    json.dumps(result.labels, ensure_ascii=False),
+                    int(result.is_product_image), int(result.safe_search_ok),
+                )
+            )
     
     def stats(self) -> str:
         total = self.hits + self.misses
         rate = (self.hits / total * 100) if total > 0 else 0
         return f"Cache: {self.hits}/{total} hits ({rate:.1f}%)"
+    
+    def close(self):
+        """Close the database; workers still running after a timeout become no-ops."""
+        with self._lock:
+            if self.conn is not None:
+                self.conn.close()
+                self.conn = None
 
 
-# Global cache instance
-vision_cache = VisionCache(VISION_CACHE_FILE)
+# Global cache instance, opened by run_scraper (importing this module must
+# not create data/vision_cache.sqlite)
+vision_cache: Optional[VisionCache] = None
 
 
 # =============================================================================
 # [4] RETRY WITH BACKOFF (sync version for compatibility)
 # =============================================================================
 
-def download_with_retry(url: str, max_retries: int = MAX_RETRIES, timeout: int = 10) -> Optional[bytes]:
-    """Download image with exponential backoff retry and strict timeout."""
+# One keep-alive session per worker thread (requests.Session is not
+# thread-safe): the HEAD pre-check and the GET, and later downloads from the
+# same CDN, reuse a connection instead of opening a new one each time
+_thread_local = threading.local()
+
+
+def _download_session():
+    """Return this worker thread's keep-alive download session."""
+    session = getattr(_thread_local, "session", None)
+    if session is None:
+        import requests
+        session = requests.Session()
+        session.headers["User-Agent"] = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) Chrome/120.0.0.0"
+        _thread_local.session = session
+    return session
+
+
+def _read_capped(response) -> Optional[bytes]:
+    """Read a streamed body in chunks; None (and drop the connection) past MAX_IMAGE_BYTES."""
+    content_length = int(response.headers.get("Content-Length", 0) or 0)
+    if content_length > MAX_IMAGE_BYTES:
+        response.close()
+        return None
+    
+    buf = bytearray()
+    for chunk in response.iter_content(64 * 1024):
+        buf.extend(chunk)
+        if len(buf) > MAX_IMAGE_BYTES:
+            response.close()
+            return None
+    return bytes(buf)
+
+
+def download_with_retry(
+    url: str,
+    max_retries: int = MAX_RETRIES,
+    timeout: int = 10,
+    session=None,
+) -> Optional[bytes]:
+    """
+    Download image with exponential backoff retry and strict timeout.
+    Uses the worker thread's keep-alive session unless one is passed in.
+    """
     import requests
+    session = session or _download_session()
     lower = url.lower()
     if any(lower.endswith(ext) for ext in [".gif", ".svg", ".ico", ".bmp", ".webp"]):
         return None
@@ -182,23 +290,22 @@ def download_with_retry(url: str, max_retries: int = MAX_RETRIES, timeout: int =
             # Download com timeout agressivo para não travar
             # HEAD pre-check to skip tiny payloads
             try:
-                head = requests.head(url, timeout=min(5, timeout), allow_redirects=True)
+                head = session.head(url, timeout=min(5, timeout), allow_redirects=True)
                 content_length = int(head.headers.get("Content-Length", 0) or 0)
-                if 0 < content_length < 5000:
+                if 0 < content_length < 5000 or content_length > MAX_IMAGE_BYTES:
                     return None
             except Exception:
                 pass
 
-            response = requests.get(
-                url,
-                timeout=timeout,
-                headers={"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) Chrome/120.0.0.0"},
-                stream=True
-            )
+            response = session.get(url, timeout=timeout, stream=True)
             if response.status_code == 200:
-                content = response.content
-                if content and len(content) > 5000:  # Mínimo 5KB
+                content = _read_capped(response)
+                if content is None:
+                    return None  # Oversized: retrying won't make it smaller
+                if len(content) > 5000:  # Mínimo 5KB
                     return content
+            else:
+                response.close()
             
             # If download failed, might be rate limit
             if attempt < max_retries - 1:
@@ -432,18 +539,31 @@ def load_exclusion_list() -> dict:
         return json.load(f)
 
 
-def should_exclude(product: dict, exclusions: dict) -> Tuple[bool, str]:
+def compile_exclusions(exclusions: dict) -> Tuple[frozenset, tuple]:
+    """
+    Normalize the exclusion list once for should_exclude.
+    Returns (upper-cased departments, (lowercase keyword, keyword) pairs).
+    """
+    depts = frozenset(d.upper() for d in exclusions.get('exclude_departments', []))
+    keywords = tuple(
+        (kw.lower(), kw)
+        for category_keywords in exclusions.get('exclude_keywords', {}).values()
+        for kw in category_keywords
+    )
+    return depts, keywords
+
+
+def should_exclude(product: dict, compiled: Tuple[frozenset, tuple]) -> Tuple[bool, str]:
+    excl_depts, keywords = compiled
     dept = product.get('Departamento', '').upper()
-    name = product.get('Descricao', '').lower()
     
-    for excl_dept in exclusions.get('exclude_departments', []):
-        if excl_dept.upper() == dept:
-            return True, f"Dept: {dept}"
+    if dept in excl_depts:
+        return True, f"Dept: {dept}"
     
-    for category, keywords in exclusions.get('exclude_keywords', {}).items():
-        for kw in keywords:
-            if kw.lower() in name:
-                return True, f"KW: {kw}"
+    name = product.get('Descricao', '').lower()
+    for kw_lower, kw in keywords:
+        if kw_lower in name:
+            return True, f"KW: {kw}"
     
     return False, ""
 
@@ -519,11 +639,20 @@ def sort_by_stock_priority(products: list, stock_only: bool = False) -> list:
         except Exception:
             return 0
     
-    with_stock = [p for p in products if get_stock(p) > 0]
-    without_stock = [p for p in products if get_stock(p) <= 0]
+    # Parse each row's stock once (it used to be parsed for both filters
+    # and again as the sort key)
+    stocked = []
+    without_stock = []
+    for p in products:
+        stock = get_stock(p)
+        if stock > 0:
+            stocked.append((stock, p))
+        else:
+            without_stock.append(p)
     
-    # Sort by stock descending
-    with_stock.sort(key=get_stock, reverse=True)
+    # Sort by stock descending (stable, like sorting the rows themselves)
+    stocked.sort(key=lambda item: item[0], reverse=True)
+    with_stock = [p for _, p in stocked]
     
     if stock_only:
         logger.info(f"📊 Stock-only mode: {len(with_stock)} products (skipping {len(without_stock)} with stock=0)")
@@ -550,6 +679,7 @@ def run_scraper(
 ):
     global USE_VISION_AI
     global SEARCH_MODE
+    global vision_cache
 
     SEARCH_MODE = (search_mode or "premium").lower()
     if workers is None:
@@ -594,6 +724,7 @@ def run_scraper(
     # Load data
     products = load_products()
     exclusions = load_exclusion_list()
+    compiled_exclusions = compile_exclusions(exclusions)
     
     # Reset progress if requested
     if reset:
@@ -673,7 +804,7 @@ def run_scraper(
                 continue
         
         # Check exclusion
-        should_excl, reason = should_exclude(product, exclusions)
+        should_excl, reason = should_exclude(product, compiled_exclusions)
         if should_excl:
             progress['excluded'].append(sku)
             progress['stats']['total_excluded'] += 1
@@ -716,6 +847,7 @@ def run_scraper(
     logger.info("=" * 70)
     print()
     
+    vision_cache = VisionCache(VISION_CACHE_FILE)
     start_time = time.time()
     
     try:
@@ -754,7 +886,6 @@ def run_scraper(
             # Save progress every 20 products
             if progress['stats']['total_processed'] % 20 == 0:
                 save_progress(progress)
-                vision_cache.save()
 
         pending = {}
         total = len(to_process)
@@ -808,12 +939,12 @@ def run_scraper(
     elapsed = time.time() - start_time
     progress['elapsed_seconds'] = elapsed
     save_progress(progress)
-    vision_cache.save()
     report_path = write_success_report(progress)
     if report_path:
         logger.info(f"📊 Success report generated: {report_path}")
     
     print_summary(progress, elapsed)
+    vision_cache.close()
 
 
 def print_summary(progress: dict, elapsed: float):
@@ -830,7 +961,8 @@ def print_summary(progress: dict, elapsed: float):
     print(f"📊 Avg Score: {stats.get('avg_vision_score', 0):.2f}")
     if elapsed > 0:
         print(f"⏱️  Time: {elapsed/60:.1f} minutes")
-    print(f"💾 {vision_cache.stats()}")
+    if vision_cache is not None:
+        print(f"💾 {vision_cache.stats()}")
     print(f"🧠 {search_cache.stats()}")
     print()
     print(f"📁 Images: {OUTPUT_DIR.absolute()}")
@@ -7,7 +7,7 @@ import csv
 import json
 import sqlite3
 from pathlib import Path
-from collections import defaultdict
+from collections import Counter, defaultdict
 
 # Paths
 INPUT_FILE = Path("data/input/Athos.csv")
@@ -16,14 +16,35 @@ EXCLUSION_FILE = Path("config/exclusion_list.json")
 DB_FILE = Path("products.db")
 IMAGES_DIR = Path("data/images")
 
-def load_csv_products():
-    """Load all products from CSV."""
-    products = []
-    with open(INPUT_FILE, 'r', encoding='utf-8-sig') as f:
-        reader = csv.DictReader(f, delimiter=';')
+# Only these columns are read from the Athos export
+CSV_COLUMNS = ('CodigoBarras', 'Descricao', 'Departamento', 'Marca')
+
+# Generic/kit name patterns (hard to find a matching image)
+GENERIC_PATTERNS = (
+    'kit', 'conjunto', 'pacote', 'lote', 'sortido', 'variado',
+    'promocao', 'oferta', 'combo', 'mix'
+)
+
+def iter_csv_products():
+    """
+    Stream products from CSV as (sku, name, department, brand) tuples.
+    Uses csv.reader with header-resolved indexes instead of DictReader,
+    so no dict is built per row. Columns missing from the export, or cut
+    off in a short row, come back as '' (what DictReader .get gave).
+    """
+    with open(INPUT_FILE, 'r', encoding='utf-8-sig', newline='') as f:
+        reader = csv.reader(f, delimiter=';')
+        header = next(reader, None)
+        if not header:
+            return
+        indexes = [header.index(col) if col in header else None for col in CSV_COLUMNS]
         for row in reader:
-            products.append(row)
-    return products
+            if not row:
+                continue
+            yield tuple(
+                row[idx] if idx is not None and idx < len(row) else ''
+                for idx in indexes
+            )
 
 def load_progress():
     """Load scraper progress."""
@@ -54,7 +75,6 @@ def analyze_missing():
     print("=" * 80)
     
     # Load data
-    products = load_csv_products()
     progress = load_progress()
     exclusions = load_exclusions()
     existing_images = find_existing_images()
@@ -65,21 +85,23 @@ def analyze_missing():
     excluded = set(progress.get("excluded", []))
     reused = set(progress.get("reused", []))
     
-    print(f"\n📊 ESTATÍSTICAS GERAIS:")
-    print(f"  Total produtos no CSV: {len(products)}")
-    print(f"  Imagens encontradas no disco: {len(existing_images)}")
-    print(f"  Scraper - Completados: {len(completed)}")
-    print(f"  Scraper - Falhados: {len(failed)}")
-    print(f"  Scraper - Excluídos: {len(excluded)}")
-    print(f"  Scraper - Reutilizados: {len(reused)}")
-    
-    # Analyze missing
+    # Single streaming pass: per-department/brand totals and the missing list
+    # are aggregated while reading, so the CSV is never held in memory.
+    total_products = 0
+    total_by_dept = Counter()
+    total_by_brand = Counter()
     missing_products = []
-    missing_by_dept = defaultdict(list)
-    missing_by_brand = defaultdict(list)
+    missing_by_dept = Counter()
+    missing_by_brand = Counter()
     
-    for product in products:
-        sku = product.get('CodigoBarras', '')
+    for sku, name, dept, brand in iter_csv_products():
+        dept = dept.strip()
+        brand = brand.strip()
+        
+        total_products += 1
+        total_by_dept[dept] += 1
+        total_by_brand[brand] += 1
+        
         if not sku or len(sku) < 5:
             continue
             
@@ -88,9 +110,8 @@ def analyze_missing():
             continue
             
         # This product is missing
-        dept = product.get('Departamento', 'SEM DEPT').strip() or 'SEM DEPT'
-        brand = product.get('Marca', 'SEM MARCA').strip() or 'SEM MARCA'
-        name = product.get('Descricao', '')
+        dept = dept or 'SEM DEPT'
+        brand = brand or 'SEM MARCA'
         
         missing_products.append({
             'sku': sku,
@@ -101,27 +122,32 @@ def analyze_missing():
             'excluded': sku in excluded
         })
         
-        missing_by_dept[dept].append(product)
-        missing_by_brand[brand].append(product)
+        missing_by_dept[dept] += 1
+        missing_by_brand[brand] += 1
+    
+    print(f"\n📊 ESTATÍSTICAS GERAIS:")
+    print(f"  Total produtos no CSV: {total_products}")
+    print(f"  Imagens encontradas no disco: {len(existing_images)}")
+    print(f"  Scraper - Completados: {len(completed)}")
+    print(f"  Scraper - Falhados: {len(failed)}")
+    print(f"  Scraper - Excluídos: {len(excluded)}")
+    print(f"  Scraper - Reutilizados: {len(reused)}")
     
     print(f"\n❌ PRODUTOS SEM IMAGEM: {len(missing_products)}")
-    print(f"  Cobertura atual: {len(existing_images)}/{len(products)} ({len(existing_images)/len(products)*100:.1f}%)")
+    print(f"  Cobertura atual: {len(existing_images)}/{total_products} ({len(existing_images)/total_products*100:.1f}%)")
     
     # Analyze by department
     print(f"\n📦 POR DEPARTAMENTO:")
-    sorted_depts = sorted(missing_by_dept.items(), key=lambda x: len(x[1]), reverse=True)
-    for dept, prods in sorted_depts[:15]:
-        total_dept = sum(1 for p in products if p.get('Departamento', '').strip() == dept)
-        missing_count = len(prods)
+    sorted_depts = missing_by_dept.most_common()
+    for dept, missing_count in sorted_depts[:15]:
+        total_dept = total_by_dept[dept]
         coverage = (total_dept - missing_count) / total_dept * 100 if total_dept > 0 else 0
         print(f"  {dept:20s}: {missing_count:4d} faltando / {total_dept:4d} total ({coverage:.1f}% cobertura)")
     
     # Analyze by brand
     print(f"\n🏷️  POR MARCA (Top 20 com mais faltando):")
-    sorted_brands = sorted(missing_by_brand.items(), key=lambda x: len(x[1]), reverse=True)
-    for brand, prods in sorted_brands[:20]:
-        total_brand = sum(1 for p in products if p.get('Marca', '').strip() == brand)
-        missing_count = len(prods)
+    for brand, missing_count in missing_by_brand.most_common(20):
+        total_brand = total_by_brand[brand]
         coverage = (total_brand - missing_count) / total_brand * 100 if total_brand > 0 else 0
         print(f"  {brand:30s}: {missing_count:4d} faltando / {total_brand:4d} total ({coverage:.1f}% cobertura)")
     
@@ -143,9 +169,8 @@ def analyze_missing():
     
     # Departments with very low coverage
     low_coverage_depts = []
-    for dept, prods in sorted_depts:
-        total_dept = sum(1 for p in products if p.get('Departamento', '').strip() == dept)
-        missing_count = len(prods)
+    for dept, missing_count in sorted_depts:
+        total_dept = total_by_dept[dept]
         coverage = (total_dept - missing_count) / total_dept * 100 if total_dept > 0 else 0
         
         if coverage < 30 and total_dept > 10:  # Less than 30% coverage and at least 10 products
@@ -161,15 +186,10 @@ def analyze_missing():
     print(f"\n📋 SUGESTÕES DE EXCLUSÃO:")
     
     # Check for generic/problematic product names
-    generic_patterns = [
-        'kit', 'conjunto', 'pacote', 'lote', 'sortido', 'variado',
-        'promocao', 'oferta', 'combo', 'mix'
-    ]
-    
     generic_products = []
     for p in missing_products:
         name_lower = p['name'].lower()
-        if any(pattern in name_lower for pattern in generic_patterns):
+        if any(pattern in name_lower for pattern in GENERIC_PATTERNS):
             generic_products.append(p)
     
     if generic_products:
@@ -182,17 +202,13 @@ def analyze_missing():
     report_file = Path("data/missing_products_report.json")
     report = {
         "summary": {
-            "total_products": len(products),
+            "total_products": total_products,
             "with_images": len(existing_images),
             "missing": len(missing_products),
-            "coverage_percent": len(existing_images) / len(products) * 100
-        },
-        "missing_by_department": {
-            dept: len(prods) for dept, prods in missing_by_dept.items()
-        },
-        "missing_by_brand": {
-            brand: len(prods) for brand, prods in missing_by_brand.items()
+            "coverage_percent": len(existing_images) / total_products * 100
         },
+        "missing_by_department": dict(missing_by_dept),
+        "missing_by_brand": dict(missing_by_brand),
         "low_coverage_departments": [
             {"dept": dept, "coverage": coverage, "total": total, "missing": missing}
             for dept, coverage, total, missing in low_coverage_depts
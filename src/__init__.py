@@ -2,21 +2,33 @@
 AquaFlora Stock Sync - src package
 """
 
-from .parser import AthosParser
-from .enricher import ProductEnricher
-from .database import ProductDatabase
-from .sync import WooSyncManager
-from .notifications import NotificationService
-from .models import RawProduct, EnrichedProduct, SyncDecision, SyncSummary
+import importlib
 
-__all__ = [
-    "AthosParser",
-    "ProductEnricher", 
-    "ProductDatabase",
-    "WooSyncManager",
-    "NotificationService",
-    "RawProduct",
-    "EnrichedProduct",
-    "SyncDecision",
-    "SyncSummary",
-]
+# Re-exports are resolved on first access: importing any submodule runs this
+# file, and eager imports here would pull in ftfy, woocommerce and httpx for
+# callers that only need the database or the enricher
+_EXPORTS = {
+    "AthosParser": ".parser",
+    "ProductEnricher": ".enricher",
+    "ProductDatabase": ".database",
+    "WooSyncManager": ".sync",
+    "NotificationService": ".notifications",
+    "RawProduct": ".models",
+    "EnrichedProduct": ".models",
+    "SyncDecision": ".models",
+    "SyncSummary": ".models",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
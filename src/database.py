@@ -85,12 +85,24 @@ class ProductDatabase:
     ALTER TABLE products ADD COLUMN exists_on_site INTEGER DEFAULT 0;
     """
     
+    # Connection tuning. The rollback journal is kept on purpose: docker-compose
+    # bind-mounts only products.db into the dashboard and bot containers, so a
+    # WAL/-shm pair would not be shared between them. journal_mode=DELETE also
+    # converts a file left in WAL mode by an earlier version.
+    PRAGMAS = (
+        "journal_mode=DELETE",
+        "busy_timeout=5000",
+        "cache_size=-20000",
+        "temp_store=MEMORY",
+    )
+    
     def __init__(self, db_path: Path):
         """Initialize database connection."""
         self.db_path = Path(db_path)
         self._ensure_dir()
         self.conn = sqlite3.connect(str(self.db_path))
         self.conn.row_factory = sqlite3.Row
+        self._apply_pragmas()
         self._init_schema()
         self._run_migrations()
         logger.info(f"Database initialized: {self.db_path}")
@@ -99,6 +111,11 @@ class ProductDatabase:
         """Ensure database directory exists."""
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
     
+    def _apply_pragmas(self):
+        """Apply connection PRAGMAs (see PRAGMAS)."""
+        for pragma in self.PRAGMAS:
+            self.conn.execute(f"PRAGMA {pragma}")
+    
     def _init_schema(self):
         """Initialize database schema."""
         cursor = self.conn.cursor()
@@ -135,25 +152,33 @@ class ProductDatabase:
     # WHITELIST METHODS (for --map-site feature)
     # =========================================================================
     
+    # Single-statement upsert: the sku PRIMARY KEY index does the conflict probe
+    UPSERT_SITE_PRODUCT = """
+    INSERT INTO products (sku, woo_id, exists_on_site, created_at)
+    VALUES (?, ?, 1, ?)
+    ON CONFLICT(sku) DO UPDATE SET
+        woo_id = excluded.woo_id,
+        exists_on_site = 1
+    """
+    
     def save_from_woocommerce(self, sku: str, woo_id: int):
         """
         Save a product mapping from WooCommerce.
         Marks the product as existing on site (whitelist).
         """
-        cursor = self.conn.cursor()
+        self.save_from_woocommerce_bulk([(sku, woo_id)])
+    
+    def save_from_woocommerce_bulk(self, pairs: List[tuple]):
+        """
+        Save many (sku, woo_id) mappings from WooCommerce in one transaction.
+        Same upsert as save_from_woocommerce, but a single commit for the batch.
+        """
         now = datetime.now().isoformat()
-        
-        cursor.execute(
-            """
-            INSERT INTO products (sku, woo_id, exists_on_site, created_at)
-            VALUES (?, ?, 1, ?)
-            ON CONFLICT(sku) DO UPDATE SET
-                woo_id = ?,
-                exists_on_site = 1
-            """,
-            (sku, woo_id, now, woo_id)
-        )
-        self.conn.commit()
+        with self.conn:
+            self.conn.executemany(
+                self.UPSERT_SITE_PRODUCT,
+                [(sku, woo_id, now) for sku, woo_id in pairs]
+            )
     
     def exists_on_site(self, sku: str) -> bool:
         """Check if a SKU exists on the WooCommerce site (whitelisted)."""
@@ -201,7 +226,7 @@ class ProductDatabase:
         
         if not row:
             # New product
-            logger.debug(f"SKU {product.sku}: NEW (not in database)")
+            logger.debug("SKU %s: NEW (not in database)", product.sku)
             return SyncDecision.NEW, None
         
         # Check price guard
@@ -227,16 +252,28 @@ class ProductDatabase:
         old_hash_fast = row['last_hash_fast']
         
         if product.hash_full != old_hash_full:
-            logger.debug(f"SKU {product.sku}: FULL_UPDATE (hash_full changed)")
+            logger.debug("SKU %s: FULL_UPDATE (hash_full changed)", product.sku)
             return SyncDecision.FULL_UPDATE, None
         
         if product.hash_fast != old_hash_fast:
-            logger.debug(f"SKU {product.sku}: FAST_UPDATE (price/stock changed)")
+            logger.debug("SKU %s: FAST_UPDATE (price/stock changed)", product.sku)
             return SyncDecision.FAST_UPDATE, None
         
-        logger.debug(f"SKU {product.sku}: SKIP (no changes)")
+        logger.debug("SKU %s: SKIP (no changes)", product.sku)
         return SyncDecision.SKIP, None
     
+    # Upsert of one sync result; woo_id is kept when the new value is NULL
+    UPSERT_SYNC_RESULT = """
+    INSERT INTO products (sku, woo_id, last_hash_full, last_hash_fast, last_price, last_sync, created_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(sku) DO UPDATE SET
+        woo_id = COALESCE(excluded.woo_id, woo_id),
+        last_hash_full = excluded.last_hash_full,
+        last_hash_fast = excluded.last_hash_fast,
+        last_price = excluded.last_price,
+        last_sync = excluded.last_sync
+    """
+    
     def save_sync_result(
         self,
         sku: str,
@@ -246,24 +283,22 @@ class ProductDatabase:
         price: float,
     ):
         """Save sync result to database."""
-        cursor = self.conn.cursor()
+        self.save_sync_results_bulk([(sku, woo_id, hash_full, hash_fast, price)])
+    
+    def save_sync_results_bulk(self, results: List[tuple]):
+        """
+        Save many (sku, woo_id, hash_full, hash_fast, price) sync results.
+        Same upsert as save_sync_result, but a single commit for the batch.
+        """
         now = datetime.now().isoformat()
-        
-        cursor.execute(
-            """
-            INSERT INTO products (sku, woo_id, last_hash_full, last_hash_fast, last_price, last_sync, created_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-            ON CONFLICT(sku) DO UPDATE SET
-                woo_id = COALESCE(?, woo_id),
-                last_hash_full = ?,
-                last_hash_fast = ?,
-                last_price = ?,
-                last_sync = ?
-            """,
-            (sku, woo_id, hash_full, hash_fast, price, now, now,
-             woo_id, hash_full, hash_fast, price, now)
-        )
-        self.conn.commit()
+        with self.conn:
+            self.conn.executemany(
+                self.UPSERT_SYNC_RESULT,
+                [
+                    (sku, woo_id, hash_full, hash_fast, price, now, now)
+                    for sku, woo_id, hash_full, hash_fast, price in results
+                ]
+            )
     
     def get_woo_id(self, sku: str) -> Optional[int]:
         """Get WooCommerce product ID for a SKU."""
@@ -335,7 +335,7 @@ class ProductEnricher:
         
         for key, (pattern, brand_name) in self._brand_patterns.items():
             if pattern.search(name_lower):
-                logger.debug(f"Detected brand '{brand_name}' in '{name}'")
+                logger.debug("Detected brand '%s' in '%s'", brand_name, name)
                 return brand_name
         
         return None
@@ -393,7 +393,7 @@ class ProductEnricher:
                     value = float(value_str) * multiplier
                     # Sanity check: between 0.001kg and 50kg
                     if 0.001 <= value <= 50:
-                        logger.debug(f"Extracted weight {value}kg from '{name}'")
+                        logger.debug("Extracted weight %skg from '%s'", value, name)
                         return round(value, 3), round(value, 3), 1
                 except ValueError:
                     continue
@@ -460,7 +460,7 @@ class ProductEnricher:
             if keyword.lower() in name.lower():
                 tags.append(keyword)
         
-        return list(set(tags))  # Remove duplicates
+        return list(dict.fromkeys(tags))  # Remove duplicates, keep order (feeds hash_full)
     
     def _generate_short_description(
         self, name: str, category: str, brand: Optional[str]
@@ -14,6 +14,7 @@ import random
 import re
 import time
 from dataclasses import dataclass, field
+from functools import lru_cache
 from io import BytesIO
 from pathlib import Path
 from hashlib import md5
@@ -358,6 +359,7 @@ BAD_URL_TOKENS = [
 ]
 
 
+@lru_cache(maxsize=256)
 def category_to_folder(category: str) -> str:
     """Normalize category to a safe folder name with proper mappings."""
     if not category:
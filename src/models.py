@@ -3,13 +3,24 @@ AquaFlora Stock Sync - Pydantic Models
 Data models for products, sync decisions, and API payloads.
 """
 
+import json
 from decimal import Decimal
 from enum import Enum
 from hashlib import md5
+from pathlib import Path
 from typing import List, Optional
 from datetime import datetime
 from pydantic import BaseModel, Field, field_validator, computed_field
 
+try:
+    import orjson
+
+    def _json_dumps_bytes(data) -> bytes:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+except ImportError:
+    def _json_dumps_bytes(data) -> bytes:
+        return json.dumps(data, indent=2, ensure_ascii=False).encode("utf-8")
+
 
 class SyncDecision(str, Enum):
     """Sync decision types based on hash comparison."""
@@ -295,7 +306,6 @@ class SyncSummary(BaseModel):
     
     def to_json_file(self, filepath: str):
         """Save summary to JSON file for bot commands."""
-        import json
         data = {
             "timestamp": self.timestamp.isoformat(),
             "success": self.success,
@@ -332,8 +342,7 @@ class SyncSummary(BaseModel):
             "ghost_skus_zeroed": self.ghost_skus_zeroed,
             "errors": self.errors,
         }
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        Path(filepath).write_bytes(_json_dumps_bytes(data))
 
 
 class ProductDBRecord(BaseModel):
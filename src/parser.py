@@ -119,7 +119,7 @@ class AthosParser:
             raise ParserError(f"Failed to read file: {e}", filename=str(filepath))
 
         # Detect format by checking first line
-        first_line = content.split('\n')[0] if content else ""
+        first_line = content.partition('\n')[0]
 
         if "Codigo;CodigoBarras;Descricao" in first_line or ";Descricao;" in first_line:
             # New clean CSV format with semicolon separator
@@ -267,7 +267,7 @@ class AthosParser:
 
             except Exception as e:
                 errors.append(f"Line {line_num}: {e}")
-                logger.debug(f"Line {line_num}: Parse error - {e}")
+                logger.debug("Line %s: Parse error - %s", line_num, e)
 
         logger.info(f"✅ Parsed {len(products)} products from {filepath.name}")
         if errors:
@@ -289,10 +289,10 @@ class AthosParser:
                 parsed = self._parse_line(line)
                 if parsed:
                     products.append(parsed)
-                    logger.debug(f"Line {line_num}: Parsed product SKU={parsed.sku}")
+                    logger.debug("Line %s: Parsed product SKU=%s", line_num, parsed.sku)
             except Exception as e:
                 errors.append(f"Line {line_num}: {e}")
-                logger.debug(f"Line {line_num}: Parse error - {e}")
+                logger.debug("Line %s: Parse error - %s", line_num, e)
         
         if errors and not products:
             raise ParserError(
@@ -3,10 +3,14 @@ AquaFlora Stock Sync - WooCommerce Sync Manager
 Handles synchronization with WooCommerce API, including batch updates and retries.
 """
 
+import json
 import logging
 import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional
 
+import requests
+from requests.adapters import HTTPAdapter
 from woocommerce import API as WooAPI
 
 from .models import (
@@ -25,6 +29,65 @@ from .exceptions import WooCommerceError, SyncError
 logger = logging.getLogger(__name__)
 
 
+class PooledWooAPI(WooAPI):
+    """
+    WooCommerce client that reuses one pooled requests.Session.
+    
+    The stock client calls requests.request() for every call, which opens a
+    new connection (and TLS handshake) each time. Over HTTPS with basic auth
+    (our setup) calls go through a shared keep-alive pool instead; OAuth over
+    plain HTTP falls back to the stock implementation.
+    
+    The library has no hook for passing a session, so this overrides its
+    private API.__request (name-mangled to _API__request). requirements.txt
+    pins the woocommerce version this was written against, and
+    tests/test_lite_mode.py fails if those private names go away.
+    """
+    
+    POOL_SIZE = 10  # >= MAP_SITE_CONCURRENCY threads sharing the client
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # No transport-level retries, same as the stock client: POST batches
+        # are retried by WooSyncManager, which knows how to report failures
+        adapter = HTTPAdapter(
+            pool_connections=self.POOL_SIZE,
+            pool_maxsize=self.POOL_SIZE,
+        )
+        self.session = requests.Session()
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({
+            "user-agent": self.user_agent,
+            "accept": "application/json",
+        })
+    
+    def close(self):
+        """Close pooled connections."""
+        self.session.close()
+    
+    def _API__request(self, method, endpoint, data, params=None, **kwargs):
+        if not self.is_ssl or self.query_string_auth:
+            return super()._API__request(method, endpoint, data, params, **kwargs)
+        
+        headers = {}
+        if data is not None:
+            data = json.dumps(data, ensure_ascii=False).encode("utf-8")
+            headers["content-type"] = "application/json;charset=utf-8"
+        
+        return self.session.request(
+            method=method,
+            url=self._API__get_url(endpoint),
+            verify=self.verify_ssl,
+            auth=(self.consumer_key, self.consumer_secret),
+            params=params or {},
+            data=data,
+            timeout=self.timeout,
+            headers=headers,
+            **kwargs,
+        )
+
+
 class WooSyncManager:
     """
     Manages WooCommerce API synchronization.
@@ -40,6 +103,7 @@ class WooSyncManager:
     MAX_RETRIES = 3
     RETRY_DELAY = 2  # seconds, doubles each retry
     BATCH_SIZE = 100  # WooCommerce API limit
+    BATCH_CONCURRENCY = 4  # Parallel batch requests; shared hosts throttle more
     
     def __init__(
         self,
@@ -52,7 +116,7 @@ class WooSyncManager:
         allow_create: bool = False,
     ):
         """Initialize WooCommerce API client."""
-        self.wcapi = WooAPI(
+        self.wcapi = PooledWooAPI(
             url=woo_url,
             consumer_key=consumer_key,
             consumer_secret=consumer_secret,
@@ -68,6 +132,10 @@ class WooSyncManager:
         create_str = "CREATE enabled" if allow_create else "UPDATE only (safe)"
         logger.info(f"WooSyncManager initialized (mode={mode_str}, {create_str}, dry_run={dry_run})")
     
+    def close(self):
+        """Release the WooCommerce client's pooled connections."""
+        self.wcapi.close()
+    
     def sync_products(
         self,
         products: List[EnrichedProduct],
@@ -110,7 +178,7 @@ class WooSyncManager:
                 else:
                     # NOT on site and creation not allowed - SKIP for safety
                     skipped_not_on_site += 1
-                    logger.debug(f"SKU {product.sku}: SKIPPED (not on site, creation disabled)")
+                    logger.debug("SKU %s: SKIPPED (not on site, creation disabled)", product.sku)
             elif decision == SyncDecision.FULL_UPDATE:
                 full_updates.append(product)
             elif decision == SyncDecision.FAST_UPDATE:
@@ -152,41 +220,12 @@ class WooSyncManager:
             full_updates = []
         
         # Process new products (always need full payload for creation)
-        for product in new_products:
-            woo_id = self._create_product(product)
-            if woo_id:
-                db.save_sync_result(
-                    product.sku, woo_id,
-                    product.hash_full, product.hash_fast,
-                    float(product.price)
-                )
-                summary.new_products += 1
-                # Track as new product
-                summary.product_changes.append(ProductChange(
-                    sku=product.sku,
-                    name=product.name,
-                    change_type='new',
-                    old_price=None,
-                    new_price=float(product.price),
-                    old_stock=None,
-                    new_stock=product.stock,
-                    price_variation=0,
-                ))
-            else:
-                summary.errors.append(f"Failed to create: {product.sku}")
+        if new_products:
+            self._batch_create_products(new_products, db, summary)
         
         # Process full updates (skipped in LITE mode)
-        for product in full_updates:
-            woo_id = db.get_woo_id(product.sku)
-            if woo_id and self._update_product_full(woo_id, product):
-                db.save_sync_result(
-                    product.sku, woo_id,
-                    product.hash_full, product.hash_fast,
-                    float(product.price)
-                )
-                summary.full_updates += 1
-            else:
-                summary.errors.append(f"Failed to update (full): {product.sku}")
+        if full_updates:
+            self._batch_full_updates(full_updates, db, summary)
         
         # Process fast updates (batch for efficiency)
         if fast_updates:
@@ -216,101 +255,180 @@ class WooSyncManager:
         
         return summary
     
-    def _create_product(self, product: EnrichedProduct) -> Optional[int]:
-        """Create a new product in WooCommerce."""
-        if self.dry_run:
-            logger.info(f"[DRY RUN] Would create product: {product.sku}")
-            return 99999  # Fake ID for dry run
+    def _post_batch(self, action: str, chunk: List[dict]) -> Optional[List[dict]]:
+        """
+        POST one chunk to products/batch with retry and backoff.
         
-        payload = WooPayloadFull.from_enriched(product)
+        Returns the per-item results for `action` ("create" or "update") in
+        request order, or None if the whole request failed. Items rejected by
+        WooCommerce carry an "error" key (see _batch_item_error).
+        """
         last_error = None
         
         for attempt in range(self.MAX_RETRIES):
             try:
-                response = self.wcapi.post("products", payload.model_dump())
+                response = self.wcapi.post("products/batch", {action: chunk})
                 
                 if response.status_code in (200, 201):
-                    woo_id = response.json().get('id')
-                    logger.info(f"Created product {product.sku} (ID: {woo_id})")
-                    return woo_id
-                else:
-                    error = WooCommerceError(
-                        f"Create failed: {response.text[:100]}",
-                        status_code=response.status_code,
-                        sku=product.sku
-                    )
-                    last_error = error
-                    
-                    # Don't retry client errors (4xx)
-                    if error.is_client_error:
-                        logger.warning(f"⚠️ {error} (not retrying - client error)")
-                        break
-                    
-                    logger.warning(f"⚠️ {error}")
-                    
-            except Exception as e:
-                last_error = WooCommerceError(str(e), sku=product.sku)
-                logger.error(f"❌ Error creating {product.sku}: {e}")
+                    return response.json().get(action, [])
+                
+                error = WooCommerceError(
+                    f"Batch {action} failed: {response.status_code}",
+                    status_code=response.status_code,
+                )
+                last_error = error
+                
+                # Don't retry client errors (4xx)
+                if error.is_client_error:
+                    logger.warning(f"⚠️ {error} (not retrying - client error)")
+                    break
+                
+                logger.warning(f"⚠️ {error}")
                 
-            # Retry with backoff (only for retryable errors)
+            except Exception as e:
+                last_error = WooCommerceError(str(e))
+                logger.error(f"❌ Batch {action} error: {e}")
+            
             if attempt < self.MAX_RETRIES - 1:
-                if last_error and hasattr(last_error, 'is_retryable') and not last_error.is_retryable:
-                    break  # Don't retry non-retryable errors
+                if last_error and not last_error.is_retryable:
+                    break
                 delay = self.RETRY_DELAY * (2 ** attempt)
                 logger.info(f"🔄 Retrying in {delay}s (attempt {attempt + 2}/{self.MAX_RETRIES})...")
                 time.sleep(delay)
         
         return None
     
-    def _update_product_full(self, woo_id: int, product: EnrichedProduct) -> bool:
-        """Update product with full payload."""
-        if self.dry_run:
-            logger.info(f"[DRY RUN] Would update product (full): {product.sku}")
-            return True
+    @staticmethod
+    def _batch_item_error(item: Optional[dict]) -> Optional[str]:
+        """Error message for a failed batch item, or None if it succeeded."""
+        if item is None:
+            return "missing from batch response"
+        error = item.get("error")
+        if not error:
+            return None
+        if isinstance(error, dict):
+            return error.get("message") or error.get("code") or str(error)
+        return str(error)
+    
+    def _run_batches(
+        self,
+        action: str,
+        entries: List[tuple],
+        summary: SyncSummary,
+    ) -> List[tuple]:
+        """
+        Send (product, payload) entries in chunks of BATCH_SIZE.
         
-        payload = WooPayloadFull.from_enriched(product)
-        last_error = None
+        Up to BATCH_CONCURRENCY chunks are in flight at once; results are
+        handled in chunk order on the calling thread.
         
-        for attempt in range(self.MAX_RETRIES):
-            try:
-                response = self.wcapi.put(f"products/{woo_id}", payload.model_dump())
-                
-                if response.status_code == 200:
-                    logger.info(f"Updated (full) product {product.sku}")
-                    return True
+        Returns (product, payload, result_item) for every item WooCommerce accepted;
+        whole-chunk and per-item failures are added to summary.errors.
+        """
+        accepted = []
+        chunks = [
+            entries[i:i + self.BATCH_SIZE]
+            for i in range(0, len(entries), self.BATCH_SIZE)
+        ]
+        
+        def _send(chunk):
+            return self._post_batch(action, [payload for _, payload in chunk])
+        
+        if len(chunks) > 1:
+            with ThreadPoolExecutor(max_workers=min(self.BATCH_CONCURRENCY, len(chunks))) as executor:
+                all_results = list(executor.map(_send, chunks))
+        else:
+            all_results = [_send(chunk) for chunk in chunks]
+        
+        for chunk, results in zip(chunks, all_results):
+            if results is None:
+                summary.errors.append(f"Batch {action} failed for {len(chunk)} products")
+                continue
+            
+            for index, (product, payload) in enumerate(chunk):
+                item = results[index] if index < len(results) else None
+                error = self._batch_item_error(item)
+                if error:
+                    logger.warning(f"⚠️ Batch {action} rejected {product.sku}: {error}")
+                    summary.errors.append(f"Failed to {action}: {product.sku} ({error})")
                 else:
-                    # Log detalhes do erro para debug
-                    try:
-                        error_detail = response.json()
-                        logger.debug(f"WooCommerce error for {product.sku}: {error_detail}")
-                    except:
-                        pass
-                    
-                    error = WooCommerceError(
-                        f"Update failed: {response.status_code}",
-                        status_code=response.status_code,
-                        sku=product.sku
-                    )
-                    last_error = error
-                    
-                    if error.is_client_error:
-                        logger.warning(f"⚠️ {error} (not retrying - client error)")
-                        break
-                    
-                    logger.warning(f"⚠️ {error}")
-                    
-            except Exception as e:
-                last_error = WooCommerceError(str(e), sku=product.sku)
-                logger.error(f"❌ Error updating {product.sku}: {e}")
+                    accepted.append((product, payload, item))
             
-            if attempt < self.MAX_RETRIES - 1:
-                if last_error and hasattr(last_error, 'is_retryable') and not last_error.is_retryable:
-                    break
-                delay = self.RETRY_DELAY * (2 ** attempt)
-                logger.info(f"🔄 Retrying in {delay}s (attempt {attempt + 2}/{self.MAX_RETRIES})...")
-                time.sleep(delay)
+            logger.info(f"Batch {action}: {len(chunk)} products sent")
+        
+        return accepted
+    
+    def _batch_create_products(
+        self,
+        products: List[EnrichedProduct],
+        db: ProductDatabase,
+        summary: SyncSummary,
+    ):
+        """Create new products through products/batch."""
+        if self.dry_run:
+            logger.info(f"[DRY RUN] Would create {len(products)} products")
+            accepted = [(product, None, {"id": 99999}) for product in products]  # Fake ID for dry run
+        else:
+            entries = [
+                (product, WooPayloadFull.from_enriched(product).model_dump())
+                for product in products
+            ]
+            accepted = self._run_batches("create", entries, summary)
         
-        return False
+        results = []
+        for product, _, item in accepted:
+            woo_id = item.get("id")
+            results.append((
+                product.sku, woo_id,
+                product.hash_full, product.hash_fast,
+                float(product.price)
+            ))
+            summary.new_products += 1
+            # Track as new product
+            summary.product_changes.append(ProductChange(
+                sku=product.sku,
+                name=product.name,
+                change_type='new',
+                old_price=None,
+                new_price=float(product.price),
+                old_stock=None,
+                new_stock=product.stock,
+                price_variation=0,
+            ))
+        db.save_sync_results_bulk(results)
+    
+    def _batch_full_updates(
+        self,
+        products: List[EnrichedProduct],
+        db: ProductDatabase,
+        summary: SyncSummary,
+    ):
+        """Update products with the full payload through products/batch."""
+        entries = []
+        for product in products:
+            woo_id = db.get_woo_id(product.sku)
+            if not woo_id:
+                summary.errors.append(f"Failed to update (full): {product.sku}")
+                continue
+            payload = WooPayloadFull.from_enriched(product).model_dump()
+            payload["id"] = woo_id
+            entries.append((product, payload))
+        
+        if self.dry_run:
+            logger.info(f"[DRY RUN] Would update {len(entries)} products (full)")
+            accepted = [(product, payload, None) for product, payload in entries]
+        else:
+            accepted = self._run_batches("update", entries, summary)
+        
+        db.save_sync_results_bulk([
+            (
+                product.sku, payload["id"],
+                product.hash_full, product.hash_fast,
+                float(product.price)
+            )
+            for product, payload, _ in accepted
+        ])
+        summary.full_updates += len(accepted)
     
     def _batch_fast_updates(
         self,
@@ -327,72 +445,53 @@ class WooSyncManager:
         # Build batch payload - LITE MODE COMPATIBLE
         # Only sends: id, regular_price, stock_quantity, manage_stock, stock_status
         # Does NOT send: name, description, short_description, categories, images, attributes
-        batch_data = []
+        entries = []
         for product in products:
             woo_id = db.get_woo_id(product.sku)
             if woo_id:
                 stock_status = 'instock' if product.stock > 0 else 'outofstock'
-                batch_data.append({
+                entries.append((product, {
                     'id': woo_id,
                     'regular_price': str(product.price),
                     'stock_quantity': product.stock,
                     'manage_stock': True,
                     'stock_status': stock_status,
-                })
+                }))
         
-        # Process in chunks of BATCH_SIZE
-        for i in range(0, len(batch_data), self.BATCH_SIZE):
-            chunk = batch_data[i:i + self.BATCH_SIZE]
-            
-            try:
-                response = self.wcapi.post(
-                    "products/batch",
-                    {"update": chunk}
-                )
-                
-                if response.status_code == 200:
-                    result = response.json()
-                    updated = len(result.get('update', []))
-                    summary.fast_updates += updated
-                    logger.info(f"Batch updated {updated} products")
-                else:
-                    logger.warning(f"Batch update failed: {response.status_code}")
-                    summary.errors.append(f"Batch update failed: {response.status_code}")
-                    
-            except Exception as e:
-                logger.error(f"Batch update error: {e}")
-                summary.errors.append(f"Batch error: {str(e)}")
+        accepted = self._run_batches("update", entries, summary)
+        summary.fast_updates += len(accepted)
         
-        # Update hashes in DB for fast updates and track changes
-        for product in products:
-            woo_id = db.get_woo_id(product.sku)
-            if woo_id:
-                # Get old price for tracking
-                old_price = db.get_last_price(product.sku)
-                new_price = float(product.price)
-                
-                # Calculate variation
-                price_variation = 0.0
-                if old_price and old_price > 0:
-                    price_variation = ((new_price - old_price) / old_price) * 100
-                
-                # Track the change
-                summary.product_changes.append(ProductChange(
-                    sku=product.sku,
-                    name=product.name,
-                    change_type='updated',
-                    old_price=old_price,
-                    new_price=new_price,
-                    old_stock=None,  # Could be added if needed
-                    new_stock=product.stock,
-                    price_variation=round(price_variation, 2),
-                ))
-                
-                db.save_sync_result(
-                    product.sku, woo_id,
-                    product.hash_full, product.hash_fast,
-                    new_price
-                )
+        # Update hashes in DB for accepted fast updates and track changes
+        results = []
+        for product, payload, _ in accepted:
+            woo_id = payload["id"]
+            # Get old price for tracking
+            old_price = db.get_last_price(product.sku)
+            new_price = float(product.price)
+            
+            # Calculate variation
+            price_variation = 0.0
+            if old_price and old_price > 0:
+                price_variation = ((new_price - old_price) / old_price) * 100
+            
+            # Track the change
+            summary.product_changes.append(ProductChange(
+                sku=product.sku,
+                name=product.name,
+                change_type='updated',
+                old_price=old_price,
+                new_price=new_price,
+                old_stock=None,  # Could be added if needed
+                new_stock=product.stock,
+                price_variation=round(price_variation, 2),
+            ))
+            
+            results.append((
+                product.sku, woo_id,
+                product.hash_full, product.hash_fast,
+                new_price
+            ))
+        db.save_sync_results_bulk(results)
     
     def _zero_ghost_stock(
         self,
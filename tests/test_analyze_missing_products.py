@@ -0,0 +1,17 @@
+from scripts import analyze_missing_products
+
+
+def test_iter_csv_products_tolerates_missing_columns_and_short_rows(tmp_path, monkeypatch):
+    csv_file = tmp_path / "Athos.csv"
+    csv_file.write_text(
+        "CodigoBarras;Descricao;Departamento\n"
+        "111;Racao Gato;Pet\n"
+        "222;Anzol\n",
+        encoding="utf-8",
+    )
+    monkeypatch.setattr(analyze_missing_products, "INPUT_FILE", csv_file)
+
+    assert list(analyze_missing_products.iter_csv_products()) == [
+        ("111", "Racao Gato", "Pet", ""),
+        ("222", "Anzol", "", ""),
+    ]
@@ -0,0 +1,46 @@
+"""
+Dashboard tests: startup and sync locking.
+"""
+
+import asyncio
+import importlib
+import sys
+import tempfile
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("apscheduler")
+
+from fastapi.testclient import TestClient
+
+from config.settings import settings
+
+
+def test_dashboard_starts_without_jinja_cache_dir(tmp_path, monkeypatch):
+    """A fresh temp dir (container, reboot) must not break template compilation."""
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+    monkeypatch.setattr(settings, "db_path", tmp_path / "products.db")
+    monkeypatch.setattr(settings, "input_dir", tmp_path / "input")
+    monkeypatch.delitem(sys.modules, "dashboard.app", raising=False)
+
+    app_module = importlib.import_module("dashboard.app")
+    cache_dir = tmp_path / "aquaflora_jinja_cache"
+
+    with TestClient(app_module.app):
+        assert cache_dir.is_dir()
+        assert any(cache_dir.iterdir())
+
+
+def test_sync_task_releases_lock_on_failure(tmp_path, monkeypatch):
+    """run_sync_task owns sync_lock, so a failed sync can't leave it held."""
+    app_module = importlib.import_module("dashboard.app")
+
+    async def failing_pool(*args, **kwargs):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(app_module, "run_in_sync_pool", failing_pool)
+    asyncio.run(app_module.run_sync_task(tmp_path / "Athos.csv"))
+
+    assert not app_module.sync_lock.locked()
+    assert not app_module.state.is_syncing
@@ -4,6 +4,7 @@ Tests for ProductDatabase SQLite operations.
 """
 
 import pytest
+import sqlite3
 from pathlib import Path
 from decimal import Decimal
 
@@ -25,6 +26,19 @@ class TestDatabaseInitialization:
         assert db_path.exists()
         db.close()
     
+    def test_database_uses_rollback_journal(self, tmp_path):
+        """WAL files can't be shared over the single-file docker bind mount."""
+        db_path = tmp_path / "test.db"
+        conn = sqlite3.connect(str(db_path))
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.close()
+        
+        db = ProductDatabase(db_path)
+        mode = db.conn.execute("PRAGMA journal_mode").fetchone()[0]
+        db.close()
+        
+        assert mode.lower() == "delete"
+    
     def test_database_stats_empty(self, temp_database):
         """New database should have zero products."""
         stats = temp_database.get_stats()
@@ -56,6 +70,15 @@ class TestWhitelist:
         count = temp_database.get_site_products_count()
         assert count == 3
     
+    def test_save_from_woocommerce_bulk(self, temp_database):
+        """Bulk save should upsert every mapping."""
+        temp_database.save_from_woocommerce("SKU1", 999)
+        temp_database.save_from_woocommerce_bulk([("SKU1", 1001), ("SKU2", 1002)])
+        
+        assert temp_database.get_woo_id("SKU1") == 1001
+        assert temp_database.get_woo_id("SKU2") == 1002
+        assert temp_database.get_site_products_count() == 2
+    
     def test_clear_whitelist(self, temp_database):
         """Should clear whitelist flags."""
         temp_database.save_from_woocommerce("SKU1", 1001)
@@ -170,6 +193,18 @@ class TestSyncResult:
         last_price = temp_database.get_last_price("TEST123")
         assert last_price == 150.0
 
+    def test_save_sync_results_bulk(self, temp_database):
+        """Bulk save should upsert every result and keep woo_id when None."""
+        temp_database.save_sync_result("SKU1", 1001, "a", "a", 100.0)
+        temp_database.save_sync_results_bulk([
+            ("SKU1", None, "b", "b", 120.0),
+            ("SKU2", 1002, "c", "c", 50.0),
+        ])
+
+        assert temp_database.get_woo_id("SKU1") == 1001
+        assert temp_database.get_last_price("SKU1") == 120.0
+        assert temp_database.get_woo_id("SKU2") == 1002
+
 
 class TestGhostSKUs:
     """Tests for ghost SKU detection."""
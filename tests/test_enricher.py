@@ -258,3 +258,26 @@ class TestHashing:
         
         # hash_fast only considers sku/price/stock, so should be same
         assert enriched1.hash_fast == enriched2.hash_fast
+
+
+class TestParallelEnrichment:
+    """Tests for main.enrich_products' process-pool path."""
+    
+    def test_pooled_enrichment_matches_in_process(self, sample_raw_product, monkeypatch):
+        """Spawned workers must return the same products, in input order."""
+        import main
+        
+        raw_products = [
+            sample_raw_product.model_copy(update={"sku": str(10000 + i)})
+            for i in range(12)
+        ]
+        expected, _ = main.enrich_products(raw_products)
+        
+        monkeypatch.setattr(main, "ENRICH_PARALLEL_MIN_PRODUCTS", 1)
+        monkeypatch.setattr(main, "ENRICH_CHUNK_SIZE", 4)
+        monkeypatch.setattr(main.os, "cpu_count", lambda: 2)
+        pooled, failures = main.enrich_products(raw_products)
+        
+        assert failures == []
+        assert [p.sku for p in pooled] == [p.sku for p in raw_products]
+        assert [p.hash_full for p in pooled] == [p.hash_full for p in expected]
@@ -0,0 +1,41 @@
+"""
+Import tests: entry points must not load heavy modules or open caches on import.
+"""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+
+def test_import_main_defers_heavy_modules():
+    """Parser, WooCommerce client, notifier and image scraper load on demand."""
+    deferred = [
+        "ftfy", "woocommerce", "httpx",
+        "src.parser", "src.sync", "src.notifications", "src.image_scraper",
+    ]
+    code = (
+        "import sys, main\n"
+        f"print(','.join(m for m in {deferred!r} if m in sys.modules))\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=PROJECT_ROOT, capture_output=True, text=True, check=True,
+    )
+
+    assert result.stdout.strip() == ""
+
+
+def test_import_scraper_does_not_open_vision_cache(tmp_path):
+    """The Vision AI cache database is opened by run_scraper, not on import."""
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(
+        [str(PROJECT_ROOT), os.environ.get("PYTHONPATH", "")]
+    )}
+    subprocess.run(
+        [sys.executable, "-c", "import scrape_all_images"],
+        cwd=tmp_path, env=env, capture_output=True, text=True, check=True,
+    )
+
+    assert not (tmp_path / "data" / "vision_cache.sqlite").exists()
@@ -1,7 +1,19 @@
+import inspect
+import json
+import logging
+import threading
+import time
 from decimal import Decimal
 
-from main import export_to_csv_lite
-from src.sync import WooSyncManager
+import pytest
+
+from main import (
+    _build_image_index,
+    _find_indexed_image,
+    _iter_site_product_pages,
+    export_to_csv_lite,
+)
+from src.sync import PooledWooAPI, WooAPI, WooSyncManager
 
 
 class _FakeResponse:
@@ -128,3 +140,167 @@ def test_ghost_zeroing_skips_synthetic_parent_skus(temp_database):
             }
         ]
     }
+
+
+class _PartialFailureWooApi(_FakeWooApi):
+    def post(self, endpoint, payload):
+        self.posts.append((endpoint, payload))
+        response = _FakeResponse()
+        items = [
+            {"id": 0, "error": {"code": "woocommerce_rest_invalid_id", "message": "Invalid ID."}}
+            if item["id"] == 2004 else {"id": item["id"]}
+            for item in payload["update"]
+        ]
+        response.json = lambda: {"update": items}
+        return response
+
+
+def test_full_updates_use_batch_and_report_item_errors(temp_database, sample_enriched_product):
+    temp_database.save_from_woocommerce("12345", 1001)
+    temp_database.save_from_woocommerce("67890", 2004)
+    other = sample_enriched_product.model_copy(update={"sku": "67890"})
+    fake_api = _PartialFailureWooApi()
+    syncer = WooSyncManager(
+        woo_url="https://example.test",
+        consumer_key="ck_test",
+        consumer_secret="cs_test",
+        lite_mode=False,
+        dry_run=False,
+    )
+    syncer.wcapi = fake_api
+
+    summary = syncer.sync_products([sample_enriched_product, other], temp_database)
+
+    assert len(fake_api.posts) == 1
+    assert fake_api.posts[0][0] == "products/batch"
+    assert [item["id"] for item in fake_api.posts[0][1]["update"]] == [1001, 2004]
+    assert summary.full_updates == 1
+    assert summary.success is False
+    assert summary.errors == ["Failed to update: 67890 (Invalid ID.)"]
+
+
+def test_image_index_prefers_category_folder_then_extension_priority(tmp_path):
+    image_dir = tmp_path / "images"
+    (image_dir / "pet").mkdir(parents=True)
+    (image_dir / "outros" / "sub").mkdir(parents=True)
+    (image_dir / "outros" / "sub" / "123.png").touch()
+    (image_dir / "pet" / "123.webp").touch()
+    (image_dir / "outros" / "456.gif").touch()
+    (image_dir / "outros" / "456.jpg").touch()
+    (image_dir / "outros" / "789.txt").touch()
+
+    index = _build_image_index(image_dir)
+
+    assert _find_indexed_image(index, image_dir, "123", "Pet") == image_dir / "pet" / "123.webp"
+    assert _find_indexed_image(index, image_dir, "123", "Aquarismo") == image_dir / "outros" / "sub" / "123.png"
+    assert _find_indexed_image(index, image_dir, "456", "Pet") == image_dir / "outros" / "456.jpg"
+    assert _find_indexed_image(index, image_dir, "789", "Pet") is None
+
+
+def test_batches_over_batch_size_are_split_and_all_applied(temp_database, sample_enriched_product):
+    products = []
+    for i in range(250):
+        sku = str(50000 + i)
+        temp_database.save_from_woocommerce(sku, 3000 + i)
+        products.append(sample_enriched_product.model_copy(update={"sku": sku}))
+    fake_api = _PartialFailureWooApi()
+    syncer = WooSyncManager(
+        woo_url="https://example.test",
+        consumer_key="ck_test",
+        consumer_secret="cs_test",
+        lite_mode=True,
+        dry_run=False,
+    )
+    syncer.wcapi = fake_api
+
+    summary = syncer.sync_products(products, temp_database)
+
+    assert summary.success is True
+    assert summary.fast_updates == 250
+    assert sorted(len(payload["update"]) for _, payload in fake_api.posts) == [50, 100, 100]
+
+
+def test_process_file_writes_stats_before_returning(sample_csv_file, tmp_path, monkeypatch):
+    from config.settings import settings
+    from main import process_file
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(settings, "sync_enabled", False)
+    monkeypatch.setattr(settings, "backup_enabled", False)
+    monkeypatch.setattr(settings, "discord_webhook_url", None)
+    monkeypatch.setattr(settings, "output_dir", tmp_path / "output")
+    monkeypatch.setattr(settings, "db_path", tmp_path / "products.db")
+
+    summary = process_file(sample_csv_file, lite_mode=True)
+
+    stats = json.loads((tmp_path / "last_run_stats.json").read_text(encoding="utf-8"))
+    assert stats["total_enriched"] == summary.total_enriched > 0
+
+
+def test_pooled_client_still_hooks_the_woocommerce_internals():
+    """PooledWooAPI relies on private names; fail loudly if the library renames them."""
+    assert callable(getattr(WooAPI, "_API__get_url", None))
+    request = getattr(WooAPI, "_API__request", None)
+    assert callable(request)
+    assert list(inspect.signature(request).parameters)[:5] == [
+        "self", "method", "endpoint", "data", "params",
+    ]
+
+    calls = []
+
+    class _RecordingSession:
+        def request(self, method, url, **kwargs):
+            calls.append((method, url))
+            return _FakeResponse()
+
+    api = PooledWooAPI(
+        url="https://example.test", consumer_key="ck_test", consumer_secret="cs_test",
+        version="wc/v3",
+    )
+    api.session = _RecordingSession()
+    api.get("products")
+
+    assert calls == [("GET", "https://example.test/wp-json/wc/v3/products")]
+
+
+class _PagedApi:
+    """Fake client with 50 product pages; page 2 can be made to fail."""
+
+    def __init__(self, failing_page=None):
+        self.failing_page = failing_page
+        self.fetched = []
+        self._lock = threading.Lock()
+
+    def get(self, endpoint, params):
+        page = params["page"]
+        with self._lock:
+            self.fetched.append(page)
+        if page > 2:
+            time.sleep(0.05)
+        response = _FakeResponse()
+        response.status_code = 500 if page == self.failing_page else 200
+        response.headers = {"X-WP-TotalPages": "50"}
+        response.json = lambda: [{"id": page, "sku": f"SKU{page}"}]
+        return response
+
+
+def test_site_page_fetch_stops_after_first_failed_page():
+    """A failed page cancels the pages still queued instead of fetching them all."""
+    api = _PagedApi(failing_page=2)
+    pages = _iter_site_product_pages(api, logging.getLogger(__name__))
+
+    assert next(pages)[0] == 1
+    with pytest.raises(RuntimeError, match="page 2"):
+        next(pages)
+    assert len(api.fetched) < 50
+
+
+def test_site_page_fetch_stops_when_caller_bails_out():
+    """Closing the generator (e.g. a DB error while saving) cancels queued pages."""
+    api = _PagedApi()
+    pages = _iter_site_product_pages(api, logging.getLogger(__name__))
+
+    assert next(pages)[0] == 1
+    assert next(pages)[0] == 2
+    pages.close()
+    assert len(api.fetched) < 50
@@ -146,6 +146,24 @@ class TestSyncSummary:
         decreases = summary.top_price_decreases
         assert len(decreases) == 2
         assert decreases[0].price_variation == -30  # Biggest decrease first
+    
+    def test_to_json_file(self, tmp_path):
+        """Should write readable UTF-8 JSON with the summary counts."""
+        import json
+        summary = SyncSummary(new_products=1, fast_updates=2)
+        summary.product_changes = [
+            ProductChange(sku="1", name="Ração", change_type="new",
+                         new_price=10.5, new_stock=3),
+        ]
+        output = tmp_path / "last_run_stats.json"
+        
+        summary.to_json_file(str(output))
+        
+        text = output.read_text(encoding="utf-8")
+        data = json.loads(text)
+        assert "Ração" in text
+        assert data["total_synced"] == 3
+        assert data["product_changes"][0]["new_price"] == 10.5
 
 
 class TestProductChange: